@@ -1,4 +1,3 @@
-import smbus
 import time
 
 # Config Register (R/W)
@@ -57,8 +56,11 @@ class Mode:
 
 
 class INA219:
-    def __init__(self, i2c_bus=1, addr=0x40):
-        self.bus = smbus.SMBus(i2c_bus);
+    def __init__(self, i2c_bus=1, addr=0x40, bus=None):
+        if bus is None:
+            import smbus
+            bus = smbus.SMBus(i2c_bus)
+        self.bus = bus
         self.addr = addr
 
         # Set chip to known config values to start
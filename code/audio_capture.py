@@ -0,0 +1,125 @@
+import threading
+import numpy as np
+import webrtcvad
+
+
+class CaptureBuffer:
+    """Mikrofon kaydı için önceden ayrılmış (preallocated) tampon.
+
+    sounddevice geri çağrısı blokları yerinde kopyalar; kayıt sırasında yeni
+    bellek ayrılmaz. ``view()`` yakalanan örneklere kopyasız bir görünüm
+    döndürür ve bir sonraki ``reset()`` çağrısına kadar geçerlidir.
+    """
+
+    def __init__(self, fs, channels=1, max_seconds=30.0):
+        self.fs = fs
+        self.channels = channels
+        self.max_seconds = max_seconds
+        self._buf = np.zeros((int(fs * max_seconds), channels), dtype=np.float32)
+        self._len = 0
+        self.overflow = False
+        self.closed = threading.Event()  # giriş akışı kapandığında set edilir
+
+    @property
+    def capacity(self):
+        return self._buf.shape[0]
+
+    @property
+    def size(self):
+        return self._len
+
+    @property
+    def full(self):
+        return self._len >= self.capacity
+
+    @property
+    def duration(self):
+        return self._len / self.fs
+
+    def reset(self):
+        self._len = 0
+        self.overflow = False
+        self.closed.clear()
+
+    def write(self, block):
+        """Bloğu tampona yaz; yazılan örnek sayısını döndür (doluysa eksik yazar)"""
+        n = min(len(block), self.capacity - self._len)
+        if n < len(block):
+            self.overflow = True
+        if n > 0:
+            self._buf[self._len:self._len + n] = block[:n]
+            self._len += n
+        return n
+
+    def view(self):
+        return self._buf[:self._len]
+
+
+# ------------------ Konuşma Algılama (VAD) ------------------ #
+
+def _pcm16(frame):
+    return np.int16(np.clip(frame, -1.0, 1.0) * 32767).tobytes()
+
+
+def speech_flags(audio, fs, vad, frame_ms=30):
+    """Her tam çerçeve için konuşma var mı (webrtcvad) listesini döndür"""
+    frame_len = fs * frame_ms // 1000
+    mono = audio[:, 0] if audio.ndim > 1 else audio
+    n_frames = len(mono) // frame_len
+    return [vad.is_speech(_pcm16(mono[i * frame_len:(i + 1) * frame_len]), fs)
+            for i in range(n_frames)], frame_len
+
+
+def trim_silence(audio, fs, aggressiveness=2, frame_ms=30, padding_ms=150):
+    """Baştaki ve sondaki sessizliği kırp; kopyasız bir dilim döndürür.
+
+    Hiç konuşma bulunamazsa boş bir dilim döner. Cümle içindeki duraklamalar
+    STT için korunur.
+    """
+    vad = webrtcvad.Vad(aggressiveness)
+    flags, frame_len = speech_flags(audio, fs, vad, frame_ms)
+    speech = [i for i, is_speech in enumerate(flags) if is_speech]
+    if not speech:
+        return audio[:0]
+
+    padding = fs * padding_ms // 1000
+    start = max(0, speech[0] * frame_len - padding)
+    end = min(len(audio), (speech[-1] + 1) * frame_len + padding)
+    return audio[start:end]
+
+
+class Endpointer:
+    """Kayıt sürerken sondaki sessizliği izleyip konuşmanın bittiğini tespit eder.
+
+    ``update`` kayıt iş parçacığından periyodik çağrılır ve yalnızca tampona
+    yeni eklenen tam çerçeveleri işler.
+    """
+
+    def __init__(self, fs, silence_ms=800, min_speech_ms=300, aggressiveness=2, frame_ms=30):
+        self.fs = fs
+        self.frame_ms = frame_ms
+        self.frame_len = fs * frame_ms // 1000
+        self.silence_frames = silence_ms // frame_ms
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.reset()
+
+    def reset(self):
+        self._pos = 0
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+    def update(self, capture):
+        """Konuşma bitmişse True döndür"""
+        audio = capture.view()
+        while self._pos + self.frame_len <= len(audio):
+            frame = audio[self._pos:self._pos + self.frame_len, 0]
+            self._pos += self.frame_len
+            if self.vad.is_speech(_pcm16(frame), self.fs):
+                self._speech_frames += 1
+                self._trailing_silence = 0
+            else:
+                self._trailing_silence += 1
+
+        return (self._speech_frames >= self.min_speech_frames
+                and self._trailing_silence >= self.silence_frames)
@@ -0,0 +1,123 @@
+import queue
+import threading
+import time
+import uuid
+import datetime
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class CommandJob:
+    """Sıraya alınmış tek bir sesli komut işi ve aşama süreleri"""
+
+    def __init__(self, payload):
+        self.id = uuid.uuid4().hex[:8]
+        self.payload = payload
+        self.status = "queued"  # queued -> running -> done | rejected | failed; queued -> cancelled
+        self.stage = None
+        self.stages = {}  # aşama adı -> süre (sn)
+        self.result = None
+        self.error = None
+        self.created = datetime.datetime.now().strftime("%H:%M:%S")
+        self._submitted = time.monotonic()
+        self.queue_wait = None
+        self.total = None
+
+    @contextmanager
+    def timed(self, name):
+        """Bir aşamanın süresini ölç (farklı iş parçacıklarından çağrılabilir)"""
+        self.stage = name
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.monotonic() - start, 3)
+            print(f"⏱️ [{self.id}] {name}: {self.stages[name]:.2f} sn")
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "stages": dict(self.stages),
+            "queue_wait": self.queue_wait,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+        }
+
+
+class CommandJobQueue:
+    """İşleri sırayla, tek bir yürütücü iş parçacığında çalıştırır.
+
+    Aynı anda yalnızca bir iş çalıştığı için robot hiçbir zaman iki
+    iş parçacığından birden sürülmez. ``handler(job)`` bir sonuç metni
+    döndürür; ``"rejected"`` dönerse iş reddedilmiş sayılır.
+    """
+
+    def __init__(self, handler, history=50):
+        self.handler = handler
+        self.history = history
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.current = None  # çalışan iş
+        self._worker = threading.Thread(target=self._run, name="command-jobs", daemon=True)
+        self._worker.start()
+
+    def submit(self, payload):
+        job = CommandJob(payload)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if oldest.status in ("queued", "running"):
+                    break
+                del self._jobs[oldest_id]
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def recent(self):
+        with self._lock:
+            return [job.to_dict() for job in reversed(self._jobs.values())]
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def cancel_pending(self):
+        """Sırada bekleyen (henüz başlamamış) işleri iptal et; iptal edilen sayıyı döndür"""
+        cancelled = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            job.status = "cancelled"
+            job.payload = None
+            self._queue.task_done()
+            cancelled += 1
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            job.queue_wait = round(time.monotonic() - job._submitted, 3)
+            job.status = "running"
+            self.current = job
+            start = time.monotonic()
+            try:
+                job.result = self.handler(job)
+                job.status = "rejected" if job.result == "rejected" else "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.total = round(time.monotonic() - start, 3)
+                job.stage = None
+                job.payload = None  # ses verisini bellekte tutma
+                self.current = None
+                self._queue.task_done()
@@ -0,0 +1,201 @@
+import json
+from llm_cache import normalize_transcript
+
+# Türkçe sayı sözcükleri
+NUMBER_WORDS = {
+    "sıfır": 0, "bir": 1, "iki": 2, "üç": 3, "dört": 4, "beş": 5,
+    "altı": 6, "yedi": 7, "sekiz": 8, "dokuz": 9, "on": 10,
+    "yirmi": 20, "otuz": 30, "kırk": 40, "elli": 50, "altmış": 60,
+    "yetmiş": 70, "seksen": 80, "doksan": 90,
+}
+HUNDRED = "yüz"
+
+# Cümlecikleri ayıran bağlaçlar ("önce ... sonra ...")
+CONNECTORS = {"önce", "sonra", "ardından", "sonrasında", "ve", "daha", "ondan", "en", "son", "da", "de"}
+FILLERS = {"lütfen", "şimdi", "hemen", "hadi", "tamam", "araç", "aracı"}
+
+DURATION_UNITS = {"saniye", "saniyelik", "saniyeliğine", "sn"}
+ANGLE_UNITS = {"derece", "derecelik"}
+
+FORWARD = {"ileri", "ileriye", "düz", "dümdüz"}
+BACKWARD = {"geri", "geriye", "arkaya", "tersine"}
+# "tam" yalnızca "tam tersine" öbeğinde pekiştireçtir; tek başına yön bildirmez
+INTENSIFIED = {("tam", "tersine")}
+RIGHT = {"sağa"}
+LEFT = {"sola"}
+OBSTACLE = {"engel", "engele", "görene", "görünceye", "algılayana", "algılanana", "çıkana", "kadar"}
+
+MOVE_VERBS = {"git", "gidin", "ilerle", "ilerleyin", "hareket", "et"}
+TURN_VERBS = {"dön", "dönün"}
+STOP_VERBS = {"dur", "durun", "durdur"}
+
+VOCABULARY = (CONNECTORS | FILLERS | DURATION_UNITS | ANGLE_UNITS | FORWARD | BACKWARD
+              | RIGHT | LEFT | OBSTACLE | MOVE_VERBS | TURN_VERBS | STOP_VERBS)
+
+
+def _is_number(token):
+    return token.isdigit() or token in NUMBER_WORDS or token == HUNDRED
+
+
+def _read_number(tokens, i):
+    """tokens[i]'den başlayan sayıyı oku; (değer, sonraki indeks) döndür"""
+    if tokens[i].isdigit():
+        return int(tokens[i]), i + 1
+
+    total = 0
+    while i < len(tokens) and (tokens[i] in NUMBER_WORDS or tokens[i] == HUNDRED):
+        if tokens[i] == HUNDRED:
+            total = (total or 1) * 100
+        else:
+            total += NUMBER_WORDS[tokens[i]]
+        i += 1
+    return total, i
+
+
+def _split_clauses(tokens):
+    clauses, current = [], []
+    for token in tokens:
+        if token in CONNECTORS:
+            if current:
+                clauses.append(current)
+            current = []
+        elif token not in FILLERS:
+            current.append(token)
+    if current:
+        clauses.append(current)
+    return clauses
+
+
+def _parse_clause(tokens):
+    """Tek bir cümleciği komut sözlüğüne çevir; emin değilse None"""
+    words = set()
+    duration = angle = None
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if _is_number(token):
+            value, i = _read_number(tokens, i)
+            if i >= len(tokens):
+                return None
+            unit = tokens[i]
+            if unit in DURATION_UNITS and duration is None:
+                duration = value
+            elif unit in ANGLE_UNITS and angle is None:
+                angle = value
+            else:
+                return None
+            i += 1
+            continue
+        if (token, tokens[i + 1] if i + 1 < len(tokens) else None) in INTENSIFIED:
+            words.add(tokens[i + 1])
+            i += 2
+            continue
+        if token not in VOCABULARY or token in DURATION_UNITS | ANGLE_UNITS:
+            # Sayısız birim çoğunlukla STT'nin sayıyı düşürdüğünü gösterir: varsayılanla yürütme
+            return None
+        words.add(token)
+        i += 1
+
+    if words & OBSTACLE:
+        if duration is not None or angle is not None or not words & ({"kadar"} | MOVE_VERBS | FORWARD):
+            return None
+        return {"komut": "engel_gorene_kadar_ileri_git"}
+
+    if words & TURN_VERBS:
+        if duration is not None or words & (MOVE_VERBS | STOP_VERBS):
+            return None
+        directions = [name for name, group in (("saga_don", RIGHT), ("sola_don", LEFT), ("geri_don", BACKWARD))
+                      if words & group]
+        if len(directions) != 1:
+            return None
+        if directions[0] == "geri_don":
+            if angle not in (None, 180):
+                return None
+            return {"komut": "geri_don", "derece": 180}
+        cmd = {"komut": directions[0]}
+        if angle is not None:
+            cmd["derece"] = angle
+        return cmd
+
+    if words & STOP_VERBS:
+        if duration is not None or angle is not None or words - STOP_VERBS:
+            return None
+        return {"komut": "dur"}
+
+    if words & (MOVE_VERBS | FORWARD | BACKWARD):
+        if angle is not None or words & (RIGHT | LEFT):
+            return None
+        backward = bool(words & BACKWARD)
+        if backward and words & FORWARD:
+            return None
+        if backward:
+            return {"komut": "geri_git", "sure": f"{2 if duration is None else duration}_saniye"}
+        if not words & FORWARD and not words & {"ilerle", "ilerleyin"}:
+            return None
+        cmd = {"komut": "ileri_git"}
+        if duration is not None:
+            cmd["sure"] = f"{duration}_saniye"
+        return cmd
+
+    return None
+
+
+def parse_command_text(text):
+    """Basit Türkçe komutları LLM'e gitmeden JSON listesine çevir.
+
+    Tüm cümlecikler güvenle ayrıştırılabiliyorsa LLM ile aynı biçimde JSON
+    metni döndürür; aksi halde None döner ve komut LLM'e bırakılır.
+    """
+    tokens = normalize_transcript(text).split()
+    clauses = _split_clauses(tokens)
+    if not clauses:
+        return None
+
+    commands = []
+    for clause in clauses:
+        cmd = _parse_clause(clause)
+        if cmd is None:
+            return None
+        commands.append(cmd)
+    return json.dumps(commands, ensure_ascii=False)
+
+
+class CommandStreamParser:
+    """Parça parça gelen JSON dizisinden tamamlanan nesneleri ayıklar.
+
+    LLM akışından gelen her parça ``feed`` ile verilir; kapanan her
+    ``{...}`` nesnesi hemen döndürülür, dizinin geri kalanı beklenmez.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._started = False
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        objects = []
+        while True:
+            text = self._buffer.lstrip()
+            if not self._started:
+                if not text:
+                    break
+                if text[0] != "[":
+                    # Dizi değilse akış ayrıştırılmaz; tam metin sonra doğrulanır
+                    self._buffer = text
+                    break
+                self._started = True
+                text = text[1:]
+            text = text.lstrip().lstrip(",").lstrip()
+            if not text.startswith("{"):
+                self._buffer = text
+                break
+            try:
+                obj, end = self._decoder.raw_decode(text)
+            except ValueError:
+                self._buffer = text  # nesne henüz tamamlanmadı
+                break
+            self._buffer = text[end:]
+            if isinstance(obj, dict):
+                objects.append(obj)
+        return objects
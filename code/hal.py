@@ -0,0 +1,50 @@
+import os
+from loop_scheduler import SYSTEM_CLOCK
+
+# ROBOT_BACKEND=sim ile donanım yerine simülatör kullanılır
+BACKEND_ENV = "ROBOT_BACKEND"
+
+
+class HardwareBackend:
+    """Raspberry Pi donanımı: smbus2 I2C, gpiozero motor/PWM pinleri ve HC-SR04.
+
+    Sürücüler (MPU6050, INA219, Robot) donanıma yalnızca bu fabrikalar
+    üzerinden erişir; aynı arayüzü ``simulator.SimBackend`` de sağlar.
+    Donanım kütüphaneleri yalnızca ilgili cihaz istendiğinde içe aktarılır.
+    """
+
+    name = "hardware"
+
+    def __init__(self):
+        self.clock = SYSTEM_CLOCK
+
+    def i2c_bus(self, bus_id):
+        import smbus2
+        return smbus2.SMBus(bus_id)
+
+    def motor(self, side, forward, backward):
+        from gpiozero import Motor
+        return Motor(forward=forward, backward=backward)
+
+    def pwm(self, side, pin):
+        from gpiozero import PWMOutputDevice
+        return PWMOutputDevice(pin)
+
+    def ranger(self, echo, trigger, max_distance):
+        from ranging import UltrasonicRanger
+        return UltrasonicRanger(echo=echo, trigger=trigger, max_distance=max_distance)
+
+
+def create_backend(name=None, realtime=True, **kwargs):
+    """Ada göre arka uç oluştur; ad verilmezse ``ROBOT_BACKEND`` ortam değişkeni kullanılır.
+
+    Çok iş parçacıklı uygulamalar (web arayüzü) simülatörü gerçek zamanlı
+    saatle çalıştırır; sanal saat yalnızca tek iş parçacıklı görevler içindir.
+    """
+    name = name or os.environ.get(BACKEND_ENV, "hardware")
+    if name == "hardware":
+        return HardwareBackend(**kwargs)
+    if name == "sim":
+        from simulator import SimBackend
+        return SimBackend(realtime=realtime, **kwargs)
+    raise ValueError(f"Bilinmeyen robot arka ucu: {name}")
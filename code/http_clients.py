@@ -0,0 +1,180 @@
+import time
+import random
+import bisect
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+# Yeniden denenecek HTTP durum kodları
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Gecikme histogramı kova sınırları (ms)
+HISTOGRAM_BUCKETS_MS = (25, 50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """Sabit kovalı gecikme histogramı"""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # son kova: en büyük sınırın üstü
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+
+    def observe(self, ms, error=False):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = ms if self.min_ms is None else min(self.min_ms, ms)
+        self.max_ms = ms if self.max_ms is None else max(self.max_ms, ms)
+        if error:
+            self.errors += 1
+
+    def percentile(self, p):
+        """Yüzdelik değerin düştüğü kovanın üst sınırı (ms)"""
+        if not self.count:
+            return None
+        target = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "min_ms": round(self.min_ms, 1) if self.min_ms is not None else None,
+            "max_ms": round(self.max_ms, 1) if self.max_ms is not None else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+            "buckets_ms": dict(zip([str(b) for b in self.buckets] + ["inf"], self.counts)),
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(endpoint, ms, error=False):
+    with _histograms_lock:
+        histogram = _histograms.get(endpoint)
+        if histogram is None:
+            histogram = _histograms[endpoint] = LatencyHistogram()
+        histogram.observe(ms, error)
+
+
+def latency_stats():
+    """Uç nokta başına gecikme histogramları"""
+    with _histograms_lock:
+        return {endpoint: h.snapshot() for endpoint, h in sorted(_histograms.items())}
+
+
+class PooledClient:
+    """Tek bir sunucuya kalıcı (keep-alive) bağlantı havuzu kullanan HTTP istemcisi.
+
+    Bağlantı/okuma zaman aşımları, rastgele gecikmeli (jitter) sınırlı yeniden
+    deneme ve uç nokta başına gecikme histogramı içerir. ``base_url`` yerel
+    bir test sunucusuna yönlendirilebilir.
+    """
+
+    def __init__(self, name, base_url, connect_timeout=3.0, read_timeout=10.0,
+                 retries=2, backoff=0.25, max_backoff=2.0, pool_size=4):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _sleep_backoff(self, attempt):
+        # "Full jitter": 0 ile üstel sınır arasında rastgele bekleme
+        time.sleep(random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt))))
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        """İsteği gönder; geçici hatalarda yeniden dener. Gecikme başlıkların gelişine kadar ölçülür."""
+        url = self.base_url + path
+        label = f"{self.name} {method} {endpoint or path}"
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.retries + 1):
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                observe(label, (time.monotonic() - start) * 1000, error=True)
+                if attempt == self.retries:
+                    raise
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                observe(label, (time.monotonic() - start) * 1000, error=response.status_code >= 400)
+                if not retryable or attempt == self.retries:
+                    return response
+                response.close()
+            self._sleep_backoff(attempt)
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name, base_url=None, **kwargs):
+    """Adı verilen paylaşılan istemciyi döndür; yoksa ``base_url`` ile oluştur"""
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            if base_url is None:
+                raise KeyError(f"HTTP istemcisi tanımlı değil: {name}")
+            client = _clients[name] = PooledClient(name, base_url, **kwargs)
+        return client
+
+
+class _InstrumentedTransport(httpx.HTTPTransport):
+    """httpx isteklerinin başlık gecikmesini histograma yazar"""
+
+    def __init__(self, name, **kwargs):
+        super().__init__(**kwargs)
+        self.name = name
+
+    def handle_request(self, request):
+        label = f"{self.name} {request.method} {request.url.path}"
+        start = time.monotonic()
+        try:
+            response = super().handle_request(request)
+        except httpx.TransportError:
+            observe(label, (time.monotonic() - start) * 1000, error=True)
+            raise
+        observe(label, (time.monotonic() - start) * 1000, error=response.status_code >= 400)
+        return response
+
+
+def make_httpx_client(name, connect_timeout=3.0, read_timeout=30.0, pool_size=4):
+    """OpenAI gibi httpx tabanlı SDK'lar için havuzlu ve ölçümlü istemci"""
+    return httpx.Client(
+        transport=_InstrumentedTransport(
+            name, limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)),
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+    )
+
@@ -0,0 +1,124 @@
+import dbm
+import json
+import re
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# LLM'in üretebileceği komutlar (arayuz.LLM_SYSTEM_PROMPT ile aynı küme)
+VALID_COMMANDS = {
+    "ileri_git",
+    "sola_don",
+    "saga_don",
+    "dur",
+    "geri_don",
+    "geri_git",
+    "engel_gorene_kadar_ileri_git",
+    "yapilamaz",
+}
+
+
+def normalize_transcript(text):
+    """Türkçe kurallarıyla küçük harfe çevir, noktalama ve fazla boşlukları at"""
+    text = unicodedata.normalize("NFC", text)
+    # str.lower() Türkçe I/İ harflerini yanlış çevirir
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def parse_command_list(llm_result):
+    """Geçerli bir komut JSON listesiyse listeyi, değilse None döndür"""
+    try:
+        commands = json.loads(llm_result)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(commands, list) or not commands:
+        return None
+    for cmd in commands:
+        if not isinstance(cmd, dict) or cmd.get("komut") not in VALID_COMMANDS:
+            return None
+    return commands
+
+
+class CommandCache:
+    """Normalize edilmiş transkript -> LLM JSON çıktısı önbelleği.
+
+    İki katmanlıdır: sınırlı boyutta bellek içi LRU ve yeniden başlatmalarda
+    korunan disk katmanı (dbm). Yalnızca geçerli komut JSON'u saklanır.
+    ``namespace`` model ya da istem değişince eski kayıtların kullanılmamasını sağlar.
+    """
+
+    def __init__(self, path, namespace, max_entries=256):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text):
+        return f"{self.namespace}:{normalize_transcript(text)}"
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text):
+        key = self._key(text)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            try:
+                with dbm.open(self.path, 'c') as db:
+                    value = db.get(key.encode('utf-8'))
+            except Exception as e:
+                print(f"LLM önbelleği okunurken hata: {e}")
+                value = None
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            value = value.decode('utf-8')
+            self._remember(key, value)
+            self.disk_hits += 1
+            return value
+
+    def put(self, text, llm_result):
+        """Çıktı geçerli komut JSON'u ise sakla; saklandıysa True döndür"""
+        if parse_command_list(llm_result) is None:
+            return False
+        key = self._key(text)
+        with self._lock:
+            self._remember(key, llm_result)
+            try:
+                with dbm.open(self.path, 'c') as db:
+                    db[key.encode('utf-8')] = llm_result.encode('utf-8')
+            except Exception as e:
+                print(f"LLM önbelleği kaydedilirken hata: {e}")
+        return True
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+def prompt_namespace(model, system_prompt):
+    return hashlib.sha1(f"{model}\n{system_prompt}".encode('utf-8')).hexdigest()[:12]
@@ -0,0 +1,169 @@
+import time
+import threading
+
+# Kaçırılan tiklerde davranış
+SKIP = "skip"          # kaçırılan tikleri atla, bir sonraki hizalı zamana geç
+CATCH_UP = "catch_up"  # kaçırılanları beklemeden arka arkaya çalıştır (en fazla max_catch_up)
+
+
+class RealClock:
+    """Gerçek zaman: monotonic saat, uyku ve iş parçacığında çalışan periyodik görevler.
+
+    Zamanlayıcılar ve arka plan servisleri saate bu arayüzle erişir; simülatör
+    aynı arayüzü sanal zamanla sağlar (bkz. ``simulator.VirtualClock``).
+    """
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def wait(self, event, timeout=None):
+        return event.wait(timeout)
+
+    def every(self, rate_hz, fn, name):
+        return PeriodicTask(self, rate_hz, fn, name)
+
+
+SYSTEM_CLOCK = RealClock()
+
+
+class LoopScheduler:
+    """Monoton saat üzerinde son tarih (deadline) tabanlı sabit hızlı döngü.
+
+    ``tick()`` her yinelemenin başında çağrılır: bir sonraki son tarihe kadar
+    uyur ve önceki tikten bu yana geçen gerçek süreyi (dt) döndürür. Son
+    tarihler işin süresinden bağımsız olarak ``period`` aralıklarla ilerler,
+    böylece I2C/ultrasonik/print gecikmesi döngü hızını kaydırmaz.
+
+    Periyot, titreşim (son tarihten sapma) ve taşma (iş periyodu aştı)
+    istatistikleri tutulur; ``finish()`` sonrası ``loop_stats()`` ile sorgulanır.
+
+    ``cancel`` (``wait(timeout)`` sunan bir olay/jeton) verilirse tik beklemesi
+    iptal istendiği anda erken biter; durma gecikmesi bir periyodu geçmez.
+    """
+
+    def __init__(self, rate_hz, name="loop", policy=SKIP, max_catch_up=2, cancel=None, clock=None):
+        self.rate_hz = rate_hz
+        self.period = 1.0 / rate_hz
+        self.name = name
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.cancel = cancel
+        self.clock = clock or SYSTEM_CLOCK
+        self.start()
+
+    def start(self):
+        self._start = self.clock.monotonic()
+        self._deadline = self._start + self.period  # ilk tik bir periyot sonra: dt hiçbir zaman 0 olmaz
+        self._last = self._start
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped = 0
+        self._period_sum = 0.0
+        self._period_min = None
+        self._period_max = None
+        self._jitter_sum = 0.0
+        self._jitter_max = 0.0
+
+    def tick(self):
+        """Sonraki son tarihe kadar bekle; önceki tikten geçen süreyi (s) döndür"""
+        now = self.clock.monotonic()
+        if now < self._deadline:
+            if self.cancel is not None:
+                self.clock.wait(self.cancel, self._deadline - now)
+            else:
+                self.clock.sleep(self._deadline - now)
+            now = self.clock.monotonic()
+        elif now > self._deadline:
+            self.overruns += 1
+
+        jitter = now - self._deadline
+        self._jitter_sum += jitter
+        self._jitter_max = max(self._jitter_max, jitter)
+
+        dt = now - self._last
+        self._period_sum += dt
+        self._period_min = dt if self._period_min is None else min(self._period_min, dt)
+        self._period_max = dt if self._period_max is None else max(self._period_max, dt)
+        self._last = now
+        self.ticks += 1
+
+        self._deadline += self.period
+        behind = now - self._deadline
+        if behind > 0:
+            missed = int(behind / self.period) + 1
+            if self.policy == SKIP:
+                self._deadline += missed * self.period
+                self.skipped += missed
+            elif missed > self.max_catch_up:
+                # Çok geride kalındıysa yalnızca sınırlı sayıda tik telafi edilir
+                self._deadline += (missed - self.max_catch_up) * self.period
+                self.skipped += missed - self.max_catch_up
+        return dt
+
+    def resync(self):
+        """Uzun bir bekleme sonrası son tarihleri şimdiden yeniden başlat (istatistikler korunur)"""
+        self._last = self.clock.monotonic()
+        self._deadline = self._last + self.period
+
+    @property
+    def next_deadline(self):
+        return self._deadline
+
+    def elapsed(self):
+        """Döngünün başlangıcından bu yana geçen süre (s)"""
+        return self.clock.monotonic() - self._start
+
+    def snapshot(self):
+        return {
+            "rate_hz": self.rate_hz,
+            "ticks": self.ticks,
+            "elapsed_s": round(self._last - self._start, 3),
+            "mean_period_ms": round(self._period_sum / self.ticks * 1000, 2) if self.ticks else None,
+            "min_period_ms": round(self._period_min * 1000, 2) if self._period_min is not None else None,
+            "max_period_ms": round(self._period_max * 1000, 2) if self._period_max is not None else None,
+            "mean_jitter_ms": round(self._jitter_sum / self.ticks * 1000, 2) if self.ticks else None,
+            "max_jitter_ms": round(self._jitter_max * 1000, 2),
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+        }
+
+    def finish(self):
+        """Döngü istatistiklerini son manevra kaydı olarak sakla ve döndür"""
+        stats = self.snapshot()
+        with _stats_lock:
+            _last_stats[self.name] = stats
+        return stats
+
+
+class PeriodicTask:
+    """``fn``'i kendi iş parçacığında sabit hızda çağıran arka plan görevi"""
+
+    def __init__(self, clock, rate_hz, fn, name):
+        self.fn = fn
+        self.loop = LoopScheduler(rate_hz, name, clock=clock)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.loop.tick()
+            self.fn()
+        self.loop.finish()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+
+_last_stats = {}
+_stats_lock = threading.Lock()
+
+
+def loop_stats():
+    """Her döngü adı için son tamamlanan manevranın istatistikleri"""
+    with _stats_lock:
+        return dict(sorted(_last_stats.items()))
@@ -0,0 +1,171 @@
+import json
+
+# Plan, sadeleştirme için iç gösterime çevrilir:
+#   ("turn", derece)   -> + sağa, - sola (geri_don = +180)
+#   ("fwd", saniye)    -> ileri git
+#   ("until_obstacle",)
+#   ("cmd", komut)     -> olduğu gibi geçen komut (yapilamaz vb.); birleştirme sınırıdır
+
+
+def _seconds(cmd):
+    return int(cmd.get("sure", "2_saniye").split("_")[0])
+
+
+def _expand(cmd):
+    """Komutu iç adımlara çevir; dur komutu için boş liste döner"""
+    komut = cmd.get("komut")
+    try:
+        if komut == "ileri_git":
+            return [("fwd", _seconds(cmd))]
+        if komut == "geri_git":
+            # move_back: 180° sağa dönüş + ileri git
+            return [("turn", 180), ("fwd", _seconds(cmd))]
+        if komut == "saga_don":
+            return [("turn", int(cmd.get("derece", 90)))]
+        if komut == "sola_don":
+            return [("turn", -int(cmd.get("derece", 90)))]
+        if komut == "geri_don":
+            return [("turn", 180)]
+    except (TypeError, ValueError):
+        return [("cmd", cmd)]  # hatalı değer: yürütücü hatayı olduğu gibi raporlasın
+    if komut == "dur":
+        return []
+    if komut == "engel_gorene_kadar_ileri_git":
+        return [("until_obstacle",)]
+    return [("cmd", cmd)]
+
+
+def _normalize_angle(angle):
+    angle %= 360
+    return angle - 360 if angle > 180 else angle
+
+
+def _simplify(steps):
+    """Ardışık dönüşleri net açıya, ardışık ileri gitmeleri tek süreye indir"""
+    result = []
+    for step in steps:
+        if result and step[0] in ("turn", "fwd") and result[-1][0] == step[0]:
+            result[-1] = (step[0], result[-1][1] + step[1])
+        else:
+            result.append(step)
+        if result[-1][0] == "turn":
+            angle = _normalize_angle(result[-1][1])
+            if angle == 0:
+                result.pop()
+            else:
+                result[-1] = ("turn", angle)
+    return result
+
+
+def _to_commands(steps):
+    commands = []
+    i = 0
+    while i < len(steps):
+        step = steps[i]
+        if step[0] == "turn":
+            angle = step[1]
+            if angle == 180:
+                # 180° dönüş + ileri git tek manevra: geri_git
+                if i + 1 < len(steps) and steps[i + 1][0] == "fwd":
+                    commands.append({"komut": "geri_git", "sure": f"{steps[i + 1][1]}_saniye"})
+                    i += 2
+                    continue
+                commands.append({"komut": "geri_don", "derece": 180})
+            elif angle > 0:
+                commands.append({"komut": "saga_don", "derece": angle})
+            else:
+                commands.append({"komut": "sola_don", "derece": -angle})
+        elif step[0] == "fwd":
+            commands.append({"komut": "ileri_git", "sure": f"{step[1]}_saniye"})
+        elif step[0] == "until_obstacle":
+            commands.append({"komut": "engel_gorene_kadar_ileri_git"})
+        else:
+            commands.append(step[1])
+        i += 1
+    return commands
+
+
+class PlanCompiler:
+    """LLM komut listesini artımlı olarak sadeleştirir.
+
+    - Ardışık ``ileri_git`` süreleri birleştirilir.
+    - Ardışık dönüşler net açıya indirilir; birbirini götürenler düşer.
+    - Etkisiz ``dur`` adımları atılır (her hareket zaten durarak biter).
+    - ``geri_don`` + ``ileri_git`` tek bir ``geri_git`` manevrasına çevrilir.
+
+    Komutlar akıştan geldikçe ``push`` ile verilir; artık değişmeyecek adımlar
+    hemen döndürülür, sonraki komutla birleşebilecek son adımlar bekletilir.
+    """
+
+    def __init__(self):
+        self._pending = []
+        self._emitted = 0
+        self._dropped_stop = None
+
+    def _hold_back(self):
+        """Sonraki komutla hâlâ değişebilecek kuyruk adımı sayısı"""
+        steps = self._pending
+        # Yalnızca 180° dönüş + ileri git çifti birlikte değişir (geri_git süresi uzayabilir)
+        if len(steps) >= 2 and steps[-2] == ("turn", 180) and steps[-1][0] == "fwd":
+            return 2
+        if steps and steps[-1][0] in ("turn", "fwd"):
+            return 1
+        return 0
+
+    def push(self, cmd):
+        expanded = _expand(cmd)
+        if not expanded and cmd.get("komut") == "dur":
+            self._dropped_stop = cmd
+        self._pending = _simplify(self._pending + expanded)
+
+        ready = len(self._pending) - self._hold_back()
+        if ready <= 0:
+            return []
+        # 180° dönüşün ardından gelen ileri git ile bölünmemesi için çiftler birlikte çıkar
+        commands = _to_commands(self._pending[:ready])
+        self._pending = self._pending[ready:]
+        self._emitted += len(commands)
+        return commands
+
+    def flush(self):
+        commands = _to_commands(self._pending)
+        self._pending = []
+        if not commands and not self._emitted and self._dropped_stop is not None:
+            # Plan yalnızca "dur"dan oluşuyorsa kullanıcıya geri bildirim için korunur
+            commands = [self._dropped_stop]
+        self._emitted += len(commands)
+        return commands
+
+
+def compile_plan(commands):
+    """Tam komut listesini sadeleştirilmiş listeye çevir"""
+    compiler = PlanCompiler()
+    result = []
+    for cmd in commands:
+        result.extend(compiler.push(cmd))
+    result.extend(compiler.flush())
+    return result
+
+
+def to_segments(cmd):
+    """Komutu ``Robot.follow_trajectory`` parçalarına çevir; etiket olarak komutun kendisi taşınır"""
+    komut = cmd.get("komut")
+    if komut == "ileri_git":
+        return [("forward", _seconds(cmd), cmd)]
+    if komut == "geri_git":
+        return [("turn", 180, cmd), ("forward", _seconds(cmd), None)]
+    if komut == "saga_don":
+        return [("turn", int(cmd.get("derece", 90)), cmd)]
+    if komut == "sola_don":
+        return [("turn", -int(cmd.get("derece", 90)), cmd)]
+    if komut == "geri_don":
+        return [("turn", 180, cmd)]
+    if komut == "engel_gorene_kadar_ileri_git":
+        return [("until_obstacle", None, cmd)]
+    return [("mark", None, cmd)]
+
+
+def format_plans(llm_result, optimized):
+    """Panelde gösterilmek üzere LLM planı ile uygulanan planı birlikte biçimlendir"""
+    return (f"{llm_result}\n\n⚙️ Uygulanan plan:\n"
+            f"{json.dumps(optimized, ensure_ascii=False)}")
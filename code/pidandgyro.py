@@ -1,110 +1,352 @@
-import time
-from gpiozero import Motor, PWMOutputDevice, DistanceSensor
-import smbus2 as smbus
-import tempfile
-import requests
-import soundfile as sf
-import sounddevice as sd
+import queue
+import threading
+from collections import deque, namedtuple
+from loop_scheduler import LoopScheduler, SYSTEM_CLOCK
+from ranging import RangingService
+from hal import HardwareBackend
 
 
 # MPU6050 sabitleri
-PWR_MGMT_1 = 0x6B
+SMPLRT_DIV = 0x19
+CONFIG = 0x1A
+GYRO_CONFIG = 0x1B
+FIFO_EN = 0x23
+INT_STATUS = 0x3A
 GYRO_ZOUT_H = 0x47
+USER_CTRL = 0x6A
+PWR_MGMT_1 = 0x6B
+FIFO_COUNTH = 0x72
+FIFO_R_W = 0x74
+
+FIFO_EN_ZG = 0x10           # FIFO'ya yalnızca gyro Z yazılır (örnek başına 2 bayt)
+USER_CTRL_FIFO_EN = 0x40
+USER_CTRL_FIFO_RESET = 0x04
+INT_STATUS_FIFO_OFLOW = 0x10
+FIFO_SIZE = 1024
+I2C_BLOCK_MAX = 32          # SMBus blok okuma sınırı
+
 GYRO_SCALE = 131.0  # ±250°/s
 
-def speak_text_with_elevenlabs(text):
-    try:
-        url = "https://api.elevenlabs.io/v1/text-to-speech/IuRRIAcbQK5AQk1XevPj"
-        headers = {
-            "xi-api-key": "your-api-key",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "text": text,
-            "voice_settings": {"stability": 0.5, "similarity_boost": 0.2}
-        }
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
+# Örnekleyici iş parçacığının yayımladığı değişmez anlık görüntü.
+# heading: sıfırlanmayan, sarılmamış toplam yön (°); rate: son hız (°/s); timestamp: monotonic
+GyroSnapshot = namedtuple("GyroSnapshot", "heading rate timestamp")
 
-        audio_data = response.content
-        temp_audio_path = tempfile.NamedTemporaryFile(delete=False, suffix=".wav").name
-        with open(temp_audio_path, "wb") as f:
-            f.write(audio_data)
 
-        data, samplerate = sf.read(temp_audio_path)
-        sd.play(data, samplerate)
-        sd.wait()
-        os.remove(temp_audio_path)
+def _to_int16(high, low):
+    value = (high << 8) | low
+    return value - 0x10000 if value >= 0x8000 else value
 
-    except Exception as e:
-        print(f"TTS error: {e}")
 
 class MPU6050:
-    def __init__(self, i2c_bus=1, addr=0x68):
+    """MPU6050 gyro Z sürücüsü.
+
+    Örnekleme hızı çip üzerinde ``sample_rate_hz`` (SMPLRT_DIV) ve DLPF ile
+    sabitlenir; örnekler FIFO'da biriktirilir. FIFO boşaltılırken her örnek
+    gerçek örnek aralığıyla (1 / sample_rate_hz) entegre edilir.
+
+    ``start_sampler`` ile açılan arka plan görevi yönü sabit hızda ve
+    kesintisiz entegre eder; kontrol döngüleri ``update_heading``/``snapshot``
+    ile I2C okuması yapmadan son değeri alır. Anlık görüntü tek bir atamayla
+    yayımlanan değişmez bir demettir, okuma için kilit gerekmez.
+    ``reset_heading`` toplam yönü sıfırlamaz, yalnızca referans noktasını
+    taşır; biriken kayma ``snapshot().heading`` üzerinden görülebilir.
+
+    ``bus`` ve ``clock`` verilmezse Raspberry Pi I2C veriyolu ve gerçek saat
+    kullanılır; simülatör kendi veriyolunu ve sanal saatini verir.
+    """
+
+    def __init__(self, i2c_bus=1, addr=0x68, sample_rate_hz=200, dlpf_cfg=3, use_fifo=True, bus=None, clock=None):
         self.addr = addr
-        self.heading = 0.0
+        self.clock = clock or SYSTEM_CLOCK
         self.offset = 0.0
-        self.prev_time = time.time()
+        self.rate = 0.0
+        self.prev_time = self.clock.monotonic()
         self.stationary_threshold = 0.3
-
-        self.bus = smbus.SMBus(i2c_bus)
+        self.use_fifo = use_fifo
+        self.fifo_overflows = 0
+        self.samples = 0
+        self.missed_samples = 0
+        self.read_errors = 0
+
+        self._absolute = 0.0
+        self._reference = 0.0
+        self._snapshot = GyroSnapshot(0.0, 0.0, self.prev_time)
+        self._sampler = None
+        self._sampler_loop = None
+        self._sampler_start_samples = 0
+        self._bus_lock = threading.RLock()  # kalibrasyon ile örnekleyici aynı veriyolunu paylaşır
+
+        self.bus = bus if bus is not None else HardwareBackend().i2c_bus(i2c_bus)
         self.bus.write_byte_data(self.addr, PWR_MGMT_1, 0)
-        time.sleep(0.1)
+        self.clock.sleep(0.1)
+        self.configure(sample_rate_hz, dlpf_cfg)
+
+    def configure(self, sample_rate_hz, dlpf_cfg):
+        """DLPF ve örnekleme bölücüsünü ayarla; FIFO'yu yalnızca gyro Z için aç"""
+        # DLPF açıkken (1-6) gyro çıkış hızı 1 kHz, kapalıyken 8 kHz
+        base_rate = 1000 if 1 <= dlpf_cfg <= 6 else 8000
+        divider = max(0, min(255, round(base_rate / sample_rate_hz) - 1))
+        self.sample_rate_hz = base_rate / (divider + 1)
+        self.sample_dt = 1.0 / self.sample_rate_hz
+
+        with self._bus_lock:
+            self.bus.write_byte_data(self.addr, CONFIG, dlpf_cfg & 0x07)
+            self.bus.write_byte_data(self.addr, SMPLRT_DIV, divider)
+            self.bus.write_byte_data(self.addr, GYRO_CONFIG, 0x00)  # ±250°/s
+            if self.use_fifo:
+                self.bus.write_byte_data(self.addr, FIFO_EN, FIFO_EN_ZG)
+                self.reset_fifo()
+
+    def reset_fifo(self):
+        with self._bus_lock:
+            self.bus.write_byte_data(self.addr, USER_CTRL, USER_CTRL_FIFO_RESET)
+            self.bus.write_byte_data(self.addr, USER_CTRL, USER_CTRL_FIFO_EN)
+            self.prev_time = self.clock.monotonic()
 
     def read_gyro_z(self):
-        high = self.bus.read_byte_data(self.addr, GYRO_ZOUT_H)
-        low = self.bus.read_byte_data(self.addr, GYRO_ZOUT_H + 1)
-        value = (high << 8) | low
-        if value >= 0x8000:
-            value = -((65535 - value) + 1)
-        return value
+        with self._bus_lock:
+            high, low = self.bus.read_i2c_block_data(self.addr, GYRO_ZOUT_H, 2)
+        return _to_int16(high, low)
+
+    def read_fifo(self):
+        """FIFO'daki tüm gyro Z örneklerini ham değer listesi olarak oku"""
+        with self._bus_lock:
+            if self.bus.read_byte_data(self.addr, INT_STATUS) & INT_STATUS_FIFO_OFLOW:
+                # Taşmada örnek sınırı kaybolur; FIFO sıfırlanır, aradaki süre anlık hızla kapatılır
+                self.fifo_overflows += 1
+                self.reset_fifo()
+                return None
+
+            high, low = self.bus.read_i2c_block_data(self.addr, FIFO_COUNTH, 2)
+            count = ((high << 8) | low) & ~1  # tam örnekler (2 bayt)
+            data = []
+            while count > 0:
+                n = min(count, I2C_BLOCK_MAX)
+                data.extend(self.bus.read_i2c_block_data(self.addr, FIFO_R_W, n))
+                count -= n
+        return [_to_int16(data[i], data[i + 1]) for i in range(0, len(data), 2)]
 
     def calibrate(self, samples=200):
         print("Calibrating... Do not move!")
         total = 0
         for i in range(samples):
             total += self.read_gyro_z() / GYRO_SCALE
-            time.sleep(0.01)
+            self.clock.sleep(0.01)
             if (i + 1) % 50 == 0:
                 print(f"Progress: {i + 1}/{samples}")
         self.offset = total / samples
         print(f"Calibration complete! Offset: {self.offset:.3f}°/s")
 
-    def get_rotation_rate(self):
-        raw = self.read_gyro_z()
+    def _rate_from_raw(self, raw):
         rate = (raw / GYRO_SCALE) - self.offset
         return 0.0 if abs(rate) < self.stationary_threshold else rate
 
-    def update_heading(self):
-        now = time.time()
-        dt = now - self.prev_time
-        if dt > 0:
-            rate = self.get_rotation_rate()
-            if abs(rate) > 0.1:
-                self.heading += rate * dt
-                while self.heading > 180:
-                    self.heading -= 360
-                while self.heading < -180:
-                    self.heading += 360
+    def get_rotation_rate(self):
+        return self._rate_from_raw(self.read_gyro_z())
+
+    def _integrate(self, rate, dt):
+        self.rate = rate
+        if abs(rate) > 0.1:
+            self._absolute += rate * dt
+
+    def _poll(self):
+        """Yeni örnekleri oku, toplam yöne ekle ve anlık görüntüyü yayımla"""
+        now = self.clock.monotonic()
+        if self.use_fifo:
+            elapsed = now - self.prev_time
+            samples = self.read_fifo()
+            if samples is None:
+                self.missed_samples += round(elapsed * self.sample_rate_hz)
+                self._integrate(self.get_rotation_rate(), elapsed)
+            else:
+                for raw in samples:
+                    self._integrate(self._rate_from_raw(raw), self.sample_dt)
+                self.samples += len(samples)
             self.prev_time = now
-        return self.heading
+        else:
+            dt = now - self.prev_time
+            if dt > 0:
+                self._integrate(self.get_rotation_rate(), dt)
+                self.samples += 1
+                self.prev_time = now
+        self._snapshot = GyroSnapshot(self._absolute, self.rate, now)
+
+    def _relative(self, absolute):
+        heading = absolute - self._reference
+        return heading - 360 * round(heading / 360)  # -180..180
+
+    def snapshot(self):
+        return self._snapshot
+
+    def update_heading(self):
+        """Referansa göre yön (°); örnekleyici çalışıyorsa I2C okuması yapılmaz"""
+        if self._sampler is None:
+            self._poll()
+        return self._relative(self._snapshot.heading)
 
     def reset_heading(self):
-        self.heading = 0.0
-        self.prev_time = time.time()
+        if self._sampler is None:
+            if self.use_fifo:
+                self.reset_fifo()  # önceki manevradan kalan örnekler yeni yöne eklenmez
+            self.prev_time = self.clock.monotonic()
+        self._reference = self._snapshot.heading
 
     def get_heading(self):
-        return self.heading
+        return self._relative(self._snapshot.heading)
+
+    # ------------------ Arka Plan Örnekleyici ------------------ #
+
+    def start_sampler(self, rate_hz=100):
+        """Yönü sabit hızda entegre eden arka plan görevini başlat"""
+        if self._sampler is not None:
+            return
+        if self.use_fifo:
+            self.reset_fifo()
+        self._sampler_start_samples = self.samples
+        self._sampler = self.clock.every(rate_hz, self._sample, "gyro_sampler")
+        self._sampler_loop = self._sampler.loop
+
+    def _sample(self):
+        try:
+            self._poll()
+        except OSError as e:
+            # Tek bir I2C hatası örnekleyiciyi durdurmamalı
+            self.read_errors += 1
+            print(f"Gyro okuma hatası: {e}")
+
+    def stop_sampler(self):
+        sampler = self._sampler
+        if sampler is None:
+            return
+        sampler.stop()
+        self._sampler = None
+
+    def sampler_stats(self):
+        """Örnekleyici hızı ve kaçırılan örnek sayaçları"""
+        loop = self._sampler_loop
+        stats = {
+            "running": self._sampler is not None,
+            "sample_rate_hz": self.sample_rate_hz if self.use_fifo else None,
+            "samples": self.samples,
+            "missed_samples": self.missed_samples,
+            "fifo_overflows": self.fifo_overflows,
+            "read_errors": self.read_errors,
+            "heading": round(self.get_heading(), 2),
+            "absolute_heading": round(self._snapshot.heading, 2),
+            "rate": round(self._snapshot.rate, 2),
+        }
+        if loop is not None:
+            loop_stats = loop.snapshot()
+            elapsed = loop_stats["elapsed_s"]
+            sampled = self.samples - self._sampler_start_samples
+            stats["measured_rate_hz"] = round(sampled / elapsed, 1) if elapsed > 0 else None
+            stats["loop"] = loop_stats
+            if not self.use_fifo:
+                # FIFO yokken atlanan her tik kaybolan bir örnektir
+                stats["missed_samples"] += loop_stats["skipped"]
+        return stats
+
+class CancelToken:
+    """Çalışan manevrayı durdurma isteği; her kontrol tikinde denetlenir.
+
+    İstek anı (monotonic) saklanır; döngü isteği gördüğünde geçen süre
+    durma gecikmesi olarak ölçülür. ``wait`` sayesinde ``LoopScheduler``
+    tik beklemesini iptalde erken bitirir.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or SYSTEM_CLOCK
+        self._event = threading.Event()
+        self.requested_at = None
+        self.reason = None
+
+    def cancel(self, reason="estop"):
+        if not self._event.is_set():
+            self.requested_at = self.clock.monotonic()
+            self.reason = reason
+            self._event.set()
+
+    def clear(self):
+        self._event.clear()
+        self.requested_at = None
+        self.reason = None
+
+    def is_set(self):
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        return self._event.wait(timeout)
+
+
+class BrakeController:
+    """Çarpışma süresine (TTC) göre hız sınırlayıcı.
+
+    Engele kalan boşluk (mesafe - durma mesafesi) yaklaşma hızına bölünerek
+    TTC bulunur. TTC ``brake_ttc_s`` altına indiğinde frenleme başlar; o
+    andaki boşluk ve hız referans alınır ve izin verilen hız boşlukla orantılı
+    olarak ``min_speed``'e kadar düşürülür. Böylece araç hızlı seyredip yine de
+    aynı mesafede durur. Boşluk bittiğinde 0 döner: tam duruş.
+    """
+
+    def __init__(self, brake_ttc_s=1.2, min_speed=0.25):
+        self.brake_ttc_s = brake_ttc_s
+        self.min_speed = min_speed
+        self.reset()
+
+    def reset(self):
+        self._onset_gap = None
+        self._onset_speed = None
+
+    def limit(self, speed, distance_cm, closing_cms, stop_distance_cm):
+        gap = distance_cm - stop_distance_cm
+        if gap <= 0:
+            return 0.0
+        if self._onset_gap is None:
+            if closing_cms <= 0 or gap / closing_cms > self.brake_ttc_s:
+                return speed
+            self._onset_gap = gap
+            self._onset_speed = speed
+        elif gap > self._onset_gap:
+            # Engel uzaklaştı: frenleme bırakılır
+            self.reset()
+            return speed
+        return min(speed, max(self.min_speed, self._onset_speed * gap / self._onset_gap))
+
+
+def _speak_urgent(text):
+    # tts yalnızca gerçek araçta gerekir; simülasyonda ses kütüphaneleri yüklenmez
+    from tts import speak_text_with_elevenlabs, PRIORITY_URGENT
+    speak_text_with_elevenlabs(text, priority=PRIORITY_URGENT)
+
 
 class Robot:
-    def __init__(self, gyro_sensor, left_fwd=13, left_bwd=19, right_fwd=22, right_bwd=27, left_pwm=26, right_pwm=18):
+    def __init__(self, gyro_sensor, left_fwd=13, left_bwd=19, right_fwd=22, right_bwd=27, left_pwm=26, right_pwm=18,
+                 backend=None, speak=None):
+        backend = backend or HardwareBackend()
+        self.clock = backend.clock
+        self.speak = speak or _speak_urgent
         self.gyro = gyro_sensor
-        self.sensor = DistanceSensor(echo=24, trigger=23, max_distance=1.0)
-
-        self.left_motor = Motor(forward=left_fwd, backward=left_bwd)
-        self.right_motor = Motor(forward=right_fwd, backward=right_bwd)
-        self.left_speed = PWMOutputDevice(left_pwm)
-        self.right_speed = PWMOutputDevice(right_pwm)
+        # Mesafe arka planda ölçülür; kontrol döngüleri son süzülmüş değeri okur
+        self.ranging = RangingService(backend.ranger(echo=24, trigger=23, max_distance=1.0), clock=self.clock)
+        self.ranging.start()
+
+        self.left_motor = backend.motor("left", left_fwd, left_bwd)
+        self.right_motor = backend.motor("right", right_fwd, right_bwd)
+        self.left_speed = backend.pwm("left", left_pwm)
+        self.right_speed = backend.pwm("right", right_pwm)
+
+        # Kontrol döngüsü hızları (Hz); istatistikler loop_scheduler.loop_stats() ile okunur
+        self.control_rate_hz = 50
+        self.turn_rate_hz = 100
+
+        # True: TTC'ye göre kademeli yavaşlama; False: sabit mesafede ani duruş
+        self.adaptive_braking = True
+        self.brake = BrakeController()
+
+        # Acil durdurma: her primitif her tikte denetler
+        self.cancel = CancelToken(self.clock)
+        self.halt_latencies = deque(maxlen=50)
+        self._acknowledged = None
         self.halt()
 
     # ------------------ Temel Motor Kontrolü ------------------ #
@@ -122,32 +364,88 @@ class Robot:
         self.left_speed.value = speed
         self.right_speed.value = speed
 
+    def set_wheels(self, left, right):
+        """Tekerlek güçlerini ayrı ayrı ayarla; negatif değer geri yönü ifade eder"""
+        self.left_motor.forward() if left >= 0 else self.left_motor.backward()
+        self.right_motor.forward() if right >= 0 else self.right_motor.backward()
+        self.left_speed.value = min(1.0, abs(left))
+        self.right_speed.value = min(1.0, abs(right))
+
+    def distance_cm(self):
+        """Son süzülmüş mesafe (cm); henüz ölçüm yoksa menzil sonu"""
+        distance = self.ranging.latest().distance_cm
+        return self.ranging.max_distance_cm if distance is None else distance
+
+    def estop(self, reason="estop"):
+        """Çalışan manevrayı iptal et ve motorları çağıran iş parçacığında hemen durdur"""
+        self.cancel.cancel(reason)
+        self.halt()
+
+    def clear_cancel(self):
+        self.cancel.clear()
+
+    def _cancelled(self, loop):
+        """İptal istendiyse motorları durdur, gecikmeyi ``loop`` periyoduyla birlikte kaydet ve True döndür"""
+        if not self.cancel.is_set():
+            return False
+        self.halt()
+        requested_at = self.cancel.requested_at
+        if requested_at is not None and self._acknowledged != requested_at:
+            # Aynı istek birden çok döngüde görülse de gecikme bir kez kaydedilir
+            self._acknowledged = requested_at
+            latency_ms = (self.clock.monotonic() - requested_at) * 1000
+            self.halt_latencies.append((latency_ms, loop.name, loop.period * 1000))
+            print(f"🛑 Manevra iptal edildi ({self.cancel.reason}), durma gecikmesi {latency_ms:.1f} ms "
+                  f"({loop.name}, periyot {loop.period * 1000:.1f} ms)")
+        return True
+
+    def halt_stats(self):
+        """Durma gecikmeleri; ``last_period_ms`` iptali gören döngünün periyodudur"""
+        latencies = [ms for ms, _, _ in self.halt_latencies]
+        last = self.halt_latencies[-1] if self.halt_latencies else None
+        return {
+            "cancelled": self.cancel.is_set(),
+            "reason": self.cancel.reason,
+            "count": len(latencies),
+            "last_ms": round(last[0], 2) if last else None,
+            "max_ms": round(max(latencies), 2) if latencies else None,
+            "last_loop": last[1] if last else None,
+            "last_period_ms": round(last[2], 2) if last else None,
+        }
+
+    def obstacle_speed(self, speed, stop_distance_cm):
+        """Engele göre izin verilen hız ve mesafe; hız 0 ise durulmalı"""
+        distance_cm = self.distance_cm()
+        if not self.adaptive_braking:
+            return (0.0 if distance_cm < stop_distance_cm else speed), distance_cm
+        closing_cms = self.ranging.latest().velocity_cms
+        return self.brake.limit(speed, distance_cm, closing_cms, stop_distance_cm), distance_cm
+
     # ------------------ İleri Gitme ------------------ #
 
     def move_forward(self, duration_sec, speed=1.0, kp=0.02, ki=0.005, kd=0.08):
-        start_time = time.time()
         self.gyro.reset_heading()
 
         integral = 0.0
         previous_error = 0.0
-        previous_time = time.time()
         max_integral = 1.0 / ki if ki > 0 else float('inf')
         deadband = 0
+        self.brake.reset()
+        loop = LoopScheduler(self.control_rate_hz, "move_forward", cancel=self.cancel, clock=self.clock)
 
-        while time.time() - start_time < duration_sec:
-            distance_cm = self.sensor.distance * 100
-            if distance_cm < 40:
+        while loop.elapsed() < duration_sec:
+            dt = loop.tick()
+            if self._cancelled(loop):
+                loop.finish()
+                return False
+            drive_speed, distance_cm = self.obstacle_speed(speed, 40)
+            if drive_speed == 0:
                 print(f"🚧 Engel algılandı! Mesafe: {distance_cm:.1f} cm")
                 self.halt()
-                speak_text_with_elevenlabs("Engel algılandı. Duruyorum.")
+                loop.finish()
+                self.speak("Engel algılandı. Duruyorum.")
                 return False
 
-            current_time = time.time()
-            dt = current_time - previous_time
-            if dt < 1e-6:
-                time.sleep(0.01)
-                continue
-
             current_heading = self.gyro.update_heading()
             error = current_heading if abs(current_heading) > deadband else 0.0
 
@@ -157,8 +455,8 @@ class Robot:
             correction = kp * error + ki * integral + kd * derivative
             correction = max(-0.5, min(0.5, correction))
 
-            left_power = max(0.0, min(1.0, speed + correction))
-            right_power = max(0.0, min(1.0, speed - correction))
+            left_power = max(0.0, min(1.0, drive_speed + correction))
+            right_power = max(0.0, min(1.0, drive_speed - correction))
 
             self.left_motor.forward()
             self.right_motor.forward()
@@ -170,36 +468,41 @@ class Robot:
                   f"Correction: {correction:.3f} | L: {left_power:.2f}, R: {right_power:.2f}")
 
             previous_error = error
-            previous_time = current_time
-            time.sleep(0.02)
 
         self.halt()
+        loop.finish()
         return True
 
     # ------------------ Engel Algılanana Kadar İleri Git ------------------ #
 
-    def move_until_obstacle(self, speed=1.0, kp=0.02, ki=0.005, kd=0.08, stop_distance_cm=40):
+    def move_until_obstacle(self, speed=1.0, kp=0.02, ki=0.005, kd=0.08, stop_distance_cm=40, timeout_sec=30.0):
         self.gyro.reset_heading()
 
         integral = 0.0
         previous_error = 0.0
-        previous_time = time.time()
         max_integral = 1.0 / ki if ki > 0 else float('inf')
         deadband = 0
+        self.brake.reset()
+        loop = LoopScheduler(self.control_rate_hz, "move_until_obstacle", cancel=self.cancel, clock=self.clock)
 
         while True:
-            distance_cm = self.sensor.distance * 100
-            if distance_cm < stop_distance_cm:
+            dt = loop.tick()
+            if self._cancelled(loop):
+                loop.finish()
+                return False
+            if loop.elapsed() > timeout_sec:
+                print("⏱️ Zaman aşımı: engel algılanmadı.")
+                self.halt()
+                loop.finish()
+                self.speak("Engel algılanmadı. Duruyorum.")
+                return False
+            drive_speed, distance_cm = self.obstacle_speed(speed, stop_distance_cm)
+            if drive_speed == 0:
                 print(f"🚧 Engel algılandı! Mesafe: {distance_cm:.1f} cm")
                 self.halt()
-                speak_text_with_elevenlabs("Engel algılandı. Duruyorum.")
-                return
-
-            current_time = time.time()
-            dt = current_time - previous_time
-            if dt < 1e-6:
-                time.sleep(0.01)
-                continue
+                loop.finish()
+                self.speak("Engel algılandı. Duruyorum.")
+                return True
 
             current_heading = self.gyro.update_heading()
             error = current_heading if abs(current_heading) > deadband else 0.0
@@ -210,8 +513,8 @@ class Robot:
             correction = kp * error + ki * integral + kd * derivative
             correction = max(-0.5, min(0.5, correction))
 
-            left_power = max(0.0, min(1.0, speed + correction))
-            right_power = max(0.0, min(1.0, speed - correction))
+            left_power = max(0.0, min(1.0, drive_speed + correction))
+            right_power = max(0.0, min(1.0, drive_speed - correction))
 
             self.left_motor.forward()
             self.right_motor.forward()
@@ -223,8 +526,6 @@ class Robot:
                   f"Correction: {correction:.3f} | L: {left_power:.2f}, R: {right_power:.2f}")
 
             previous_error = error
-            previous_time = current_time
-            time.sleep(0.02)
 
     # ------------------ Dönüşler ------------------ #
 
@@ -236,16 +537,16 @@ class Robot:
 
         previous_error = abs(angle_deg)
         cumulative_error = 0.0
-        previous_time = time.time()
         left_fwd, right_fwd = (True, False) if direction == "right" else (False, True)
 
         timeout = 10.0
-        start_time = time.time()
+        loop = LoopScheduler(self.turn_rate_hz, "turn", cancel=self.cancel, clock=self.clock)
+        completed = False
 
         while True:
-            now = time.time()
-            dt = max(0.001, now - previous_time)
-            previous_time = now
+            dt = loop.tick()
+            if self._cancelled(loop):
+                break
 
             current_angle = abs(self.gyro.update_heading())
             error = abs(angle_deg) - current_angle
@@ -261,28 +562,185 @@ class Robot:
 
             if error <= 1.0:
                 print("✅ Dönüş tamamlandı.")
+                completed = True
                 break
-            if now - start_time > timeout:
+            if loop.elapsed() > timeout:
                 print("⏱️ Zaman aşımı.")
                 break
 
-            time.sleep(0.01)
-
         self.halt()
+        loop.finish()
+        return completed
+
+    # ------------------ Kesintisiz Yörünge ------------------ #
+
+    def follow_trajectory(self, segments, speed=1.0, kp=0.02, ki=0.005, kd=0.08,
+                          turn_kp=0.12, min_turn_power=0.15, max_turn_power=0.5, turn_carry=0.4,
+                          turn_tolerance=3.0, turn_timeout=10.0, stop_distance_cm=40, timeout_sec=30.0,
+                          on_segment=None):
+        """Hareket parçalarını aralarda durmadan tek kontrol döngüsünde uygula.
+
+        ``segments`` bir liste ya da ``None`` ile sonlanan ``queue.Queue`` olabilir.
+        Her parça ``(tür, değer, etiket)`` üçlüsüdür:
+
+        - ``("forward", saniye, etiket)``: yön tutarak ileri git
+        - ``("turn", derece, etiket)``: + sağa, - sola dön
+        - ``("until_obstacle", None, etiket)``: engel görene kadar ileri git
+        - ``("mark", None, etiket)``: hareketsiz; yalnızca ``on_segment`` çağrılır
+
+        Yön tek sefer sıfırlanır ve döngü boyunca entegre edilir; hedef yön her
+        dönüşte birikir, böylece bir dönüşte kalan hata sonraki düz gidişte düzeltilir.
+        İleri gidişten gelen dönüşler hızın ``turn_carry`` oranını koruyarak yay
+        çizer. Kuyruk boşalıp akış henüz bitmediyse araç durup sonraki parçayı bekler.
+        Parça başlarken etiketi ``None`` değilse ``on_segment(etiket)`` çağrılır.
+        ``until_obstacle`` parçası ``timeout_sec`` içinde engel görmezse araç durur.
+        İptal edilir ya da zaman aşımı olursa False, plan bittiğinde True döner.
+        """
+        if isinstance(segments, queue.Queue):
+            def next_segment(block):
+                # Beklerken de iptal denetlenir; kuyruk bir periyottan uzun bloklamaz
+                while True:
+                    try:
+                        return segments.get(timeout=1.0 / self.control_rate_hz) if block else segments.get_nowait()
+                    except queue.Empty:
+                        if not block or self.cancel.is_set():
+                            return False
+        else:
+            iterator = iter(segments)
+
+            def next_segment(block):
+                return next(iterator, None)
+
+        self.gyro.reset_heading()
+        previous_raw = 0.0
+        heading = 0.0          # sarılmamış (±180 ile sınırlı olmayan) yön
+        target = 0.0
+        integral = 0.0
+        previous_error = 0.0
+        max_integral = 1.0 / ki if ki > 0 else float('inf')
+        loop = LoopScheduler(self.control_rate_hz, "trajectory", cancel=self.cancel, clock=self.clock)
+        carry = 0.0            # dönüşe taşınacak ileri hız
+        drive_speed = speed    # frenleme sonrası uygulanan ileri hız
+        segment = None
+
+        try:
+            while True:
+                if self._cancelled(loop):
+                    return False
+                if segment is None:
+                    segment = next_segment(block=False)
+                    if segment is False:
+                        # Sonraki parça henüz gelmedi: güvenli tarafta kalıp bekle
+                        self.halt()
+                        carry = 0.0
+                        segment = next_segment(block=True)
+                        loop.resync()
+                        if segment is False:
+                            continue  # iptal: döngü başında işlenir
+                    if segment is None:
+                        break
+                    kind, value, tag = segment
+                    segment_start = loop.elapsed()
+                    if kind in ("forward", "until_obstacle"):
+                        self.brake.reset()
+                    if kind == "turn":
+                        # Sağa dönüş jiroskopta negatif yön demektir
+                        target -= value
+                        if abs(value) < turn_tolerance:
+                            segment = None
+                    if tag is not None and on_segment is not None:
+                        on_segment(tag)
+                    if kind == "mark":
+                        segment = None
+                    if segment is None:
+                        continue
+
+                dt = loop.tick()
+                if self._cancelled(loop):
+                    return False
+                now = loop.elapsed()
+
+                raw = self.gyro.update_heading()
+                delta = raw - previous_raw
+                delta -= 360 * round(delta / 360)
+                heading += delta
+                previous_raw = raw
+
+                if kind in ("forward", "until_obstacle"):
+                    if kind == "forward" and now - segment_start >= value:
+                        carry = drive_speed * turn_carry
+                        segment = None
+                        continue
+                    if kind == "until_obstacle" and now - segment_start >= timeout_sec:
+                        print("⏱️ Zaman aşımı: engel algılanmadı.")
+                        self.halt()
+                        self.speak("Engel algılanmadı. Duruyorum.")
+                        return False
+
+                    drive_speed, distance_cm = self.obstacle_speed(speed, stop_distance_cm)
+                    if drive_speed == 0:
+                        print(f"🚧 Engel algılandı! Mesafe: {distance_cm:.1f} cm")
+                        self.halt()
+                        self.speak("Engel algılandı. Duruyorum.")
+                        carry = 0.0
+                        segment = None
+                        continue
+
+                    error = heading - target
+                    integral += error * dt
+                    integral = max(-max_integral, min(max_integral, integral))
+                    derivative = (error - previous_error) / dt
+                    correction = max(-0.5, min(0.5, kp * error + ki * integral + kd * derivative))
+
+                    left_power = max(0.0, min(1.0, drive_speed + correction))
+                    right_power = max(0.0, min(1.0, drive_speed - correction))
+                    self.set_wheels(left_power, right_power)
+                    previous_error = error
+
+                    print(f"🧭 Heading: {heading:.2f}° | Target: {target:.2f}° | Error: {error:.2f}° | "
+                          f"Correction: {correction:.3f} | L: {left_power:.2f}, R: {right_power:.2f}")
+
+                else:  # turn
+                    remaining = target - heading
+                    if abs(remaining) <= turn_tolerance or now - segment_start > turn_timeout:
+                        if abs(remaining) > turn_tolerance:
+                            print("⏱️ Zaman aşımı.")
+                        print("✅ Dönüş tamamlandı.")
+                        # Düz gidişe geçerken PID geçmişi sıfırlanır; kalan açı hatası orada düzeltilir
+                        integral = 0.0
+                        previous_error = heading - target
+                        segment = None
+                        continue
+
+                    turn_power = max(min_turn_power, min(max_turn_power, turn_kp * abs(remaining)))
+                    turn_sign = 1 if remaining < 0 else -1  # + : sağa
+                    left_power = carry + turn_sign * turn_power
+                    right_power = carry - turn_sign * turn_power
+                    self.set_wheels(left_power, right_power)
+
+                    print(f"🔄 Target: {target:.1f}° | Now: {heading:.1f}° | Remaining: {remaining:.1f}° | "
+                          f"L: {left_power:.2f}, R: {right_power:.2f}")
+            return True
+        finally:
+            self.halt()
+            loop.finish()
 
     def turn_right(self, degrees, **kwargs):
-        self._execute_pid_turn(degrees, direction="right", **kwargs)
+        return self._execute_pid_turn(degrees, direction="right", **kwargs)
 
     def turn_left(self, degrees, **kwargs):
-        self._execute_pid_turn(degrees, direction="left", **kwargs)
+        return self._execute_pid_turn(degrees, direction="left", **kwargs)
     
     def turn_back(self, **kwargs):
-        self._execute_pid_turn(180, direction="right", **kwargs)
+        return self._execute_pid_turn(180, direction="right", **kwargs)
 
     
     def move_back(self, duration_sec, speed=1.0, kp=0.015, ki=0.005, kd=0.08):
         self._execute_pid_turn(180, direction="right", kp=1.0, ki=0.0, kd=0.0)
-        self.move_forward(duration_sec, speed=speed, kp=kp, ki=ki, kd=kd)
+        if self.cancel.is_set():
+            return False
+        return self.move_forward(duration_sec, speed=speed, kp=kp, ki=ki, kd=kd)
 
     def shutdown(self):
         self.halt()
+        self.ranging.stop()
@@ -0,0 +1,155 @@
+import time
+import threading
+import statistics
+from collections import deque, namedtuple
+from loop_scheduler import SYSTEM_CLOCK
+
+SPEED_OF_SOUND = 343.26  # m/s (20 °C)
+
+# Servisin yayımladığı değişmez okuma.
+# distance_cm: süzülmüş mesafe (henüz ölçüm yoksa None); velocity_cms: yaklaşma hızı (+ yaklaşıyor)
+# timestamp: ölçümün monotonic zamanı; raw_cm: son ham ölçüm (yankı yoksa None)
+RangeReading = namedtuple("RangeReading", "distance_cm velocity_cms timestamp raw_cm")
+
+
+class UltrasonicRanger:
+    """HC-SR04 sürücüsü: yankı süresi pin fabrikasının kenar tiklerinden ölçülür"""
+
+    def __init__(self, echo=24, trigger=23, max_distance=1.0):
+        from gpiozero import DigitalInputDevice, DigitalOutputDevice
+        self.max_distance = max_distance
+        self.trigger = DigitalOutputDevice(trigger)
+        self.echo = DigitalInputDevice(echo)
+        self._rise = None
+        self._duration = None
+        self._done = threading.Event()
+        # Kenar zamanları Python iş parçacığı gecikmesinden bağımsız olsun diye doğrudan pin geri çağrısı
+        self.echo.pin.when_changed = self._echo_changed
+
+    def _echo_changed(self, ticks, state):
+        if state:
+            self._rise = ticks
+        elif self._rise is not None:
+            self._duration = self.echo.pin_factory.ticks_diff(ticks, self._rise)
+            self._done.set()
+
+    def measure(self):
+        """Tek ölçüm (m); zaman aşımında (menzil dışı) None"""
+        self._done.clear()
+        self._rise = None
+        self.trigger.on()
+        time.sleep(0.00001)
+        self.trigger.off()
+        timeout = 2 * self.max_distance / SPEED_OF_SOUND + 0.01
+        if not self._done.wait(timeout):
+            return None
+        return min(self.max_distance, self._duration * SPEED_OF_SOUND / 2)
+
+    def close(self):
+        self.trigger.close()
+        self.echo.close()
+
+
+class RangingService:
+    """Ultrasonik ölçümü kendi zamanlamasıyla yapan arka plan servisi.
+
+    Her tikte bir ölçüm alınır; son ``window`` ölçümün medyanı tekil
+    sıçramaları bastırır. Süzülmüş mesafe geçmişinden (son
+    ``velocity_window`` saniye) doğrusal eğimle yaklaşma hızı hesaplanır.
+    Sonuç tek atamayla yayımlanan ``RangeReading`` demetidir; kontrol
+    döngüleri ``latest()`` ile sabit sürede okur, yankı gecikmesini beklemez.
+    """
+
+    def __init__(self, ranger, rate_hz=20, window=5, velocity_window=0.3, outlier_cm=25.0, clock=None):
+        self.ranger = ranger
+        self.clock = clock or SYSTEM_CLOCK
+        self.rate_hz = rate_hz
+        self.window = window
+        self.velocity_window = velocity_window
+        self.outlier_cm = outlier_cm
+        self.max_distance_cm = ranger.max_distance * 100
+
+        self._raw = deque(maxlen=window)
+        self._history = deque()
+        self._latest = RangeReading(None, 0.0, None, None)
+        self._ready = threading.Event()
+        self._task = None
+        self._loop = None
+
+        self.measurements = 0
+        self.timeouts = 0
+        self.outliers = 0
+
+    def start(self, wait=0.5):
+        """Servisi başlat; ilk okuma için en fazla ``wait`` saniye bekle"""
+        if self._task is None:
+            self._task = self.clock.every(self.rate_hz, self._sample, "ranging")
+            self._loop = self._task.loop
+        self.clock.wait(self._ready, wait)
+
+    def stop(self):
+        task = self._task
+        if task is None:
+            return
+        task.stop()
+        self._task = None
+
+    def latest(self):
+        return self._latest
+
+    def _sample(self):
+        try:
+            raw = self.ranger.measure()
+        except Exception as e:
+            print(f"Mesafe ölçüm hatası: {e}")
+            return
+        self._update(None if raw is None else raw * 100, self.clock.monotonic())
+
+    def _update(self, raw_cm, now):
+        self.measurements += 1
+        if raw_cm is None:
+            # Yankı yok: menzil içinde engel yok kabul edilir
+            self.timeouts += 1
+            sample = self.max_distance_cm
+        else:
+            sample = raw_cm
+
+        if len(self._raw) == self.window and abs(sample - statistics.median(self._raw)) > self.outlier_cm:
+            self.outliers += 1  # medyan pencere tekil sıçramayı zaten bastırır; yalnızca sayılır
+        self._raw.append(sample)
+        distance = statistics.median(self._raw)
+
+        self._history.append((now, distance))
+        while self._history and now - self._history[0][0] > self.velocity_window:
+            self._history.popleft()
+
+        self._latest = RangeReading(distance, self._approach_velocity(), now, raw_cm)
+        self._ready.set()
+
+    def _approach_velocity(self):
+        """Süzülmüş mesafenin zamana göre eğimi (cm/s); yaklaşırken pozitif"""
+        n = len(self._history)
+        if n < 2:
+            return 0.0
+        mean_t = sum(t for t, _ in self._history) / n
+        mean_d = sum(d for _, d in self._history) / n
+        var_t = sum((t - mean_t) ** 2 for t, _ in self._history)
+        if var_t <= 0:
+            return 0.0
+        slope = sum((t - mean_t) * (d - mean_d) for t, d in self._history) / var_t
+        return -slope
+
+    def stats(self):
+        reading = self._latest
+        stats = {
+            "running": self._task is not None,
+            "distance_cm": round(reading.distance_cm, 1) if reading.distance_cm is not None else None,
+            "velocity_cms": round(reading.velocity_cms, 1),
+            "age_ms": round((self.clock.monotonic() - reading.timestamp) * 1000, 1) if reading.timestamp is not None else None,
+            "measurements": self.measurements,
+            "timeouts": self.timeouts,
+            "outliers": self.outliers,
+        }
+        if self._loop is not None:
+            stats["loop"] = self._loop.snapshot()
+        return stats
@@ -0,0 +1,466 @@
+import math
+import random
+import threading
+from loop_scheduler import LoopScheduler, SYSTEM_CLOCK
+
+# MPU6050 / INA219 yazmaçları (sürücülerle aynı adresler)
+MPU_SMPLRT_DIV = 0x19
+MPU_CONFIG = 0x1A
+MPU_FIFO_EN = 0x23
+MPU_INT_STATUS = 0x3A
+MPU_GYRO_ZOUT_H = 0x47
+MPU_USER_CTRL = 0x6A
+MPU_FIFO_COUNTH = 0x72
+MPU_FIFO_R_W = 0x74
+MPU_FIFO_SIZE = 1024
+MPU_GYRO_SCALE = 131.0
+
+INA_SHUNTVOLTAGE = 0x01
+INA_BUSVOLTAGE = 0x02
+INA_POWER = 0x03
+INA_CURRENT = 0x04
+INA_SHUNT_OHMS = 0.1
+
+
+# ------------------ Sanal Saat ------------------ #
+
+class _VirtualTask:
+    """Sanal saatte zamanı gelince çağrılan periyodik görev"""
+
+    def __init__(self, clock, rate_hz, fn, name):
+        self.clock = clock
+        self.fn = fn
+        self.loop = LoopScheduler(rate_hz, name, clock=clock)
+
+    @property
+    def due(self):
+        return self.loop.next_deadline
+
+    def fire(self):
+        self.loop.tick()  # saat tam son tarihte: beklemez, istatistik tutar
+        self.fn()
+
+    def stop(self):
+        if self in self.clock._tasks:
+            self.clock._tasks.remove(self)
+            self.loop.finish()
+
+
+class VirtualClock:
+    """Gerçek zamandan bağımsız ilerleyen sanal saat.
+
+    ``sleep`` zamanı beklemeden ilerletir; ilerlerken zamanı gelen periyodik
+    görevler (gyro örnekleyici, mesafe servisi) sırayla çağrılır. Arka plan
+    iş parçacığı açılmaz; saat tek bir kontrol iş parçacığı tarafından
+    sürülür, böylece tüm görev gerçek zamandan çok daha hızlı ve her
+    çalıştırmada aynı sırayla yürür.
+    """
+
+    def __init__(self, start=0.0, max_wait=3600.0):
+        self._now = start
+        self._tasks = []
+        self.max_wait = max_wait
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self.advance(max(0.0, seconds))
+
+    def wait(self, event, timeout=None):
+        """Olay kurulana ya da süre dolana kadar zamanı görev adımlarıyla ilerlet"""
+        deadline = self._now + (self.max_wait if timeout is None else timeout)
+        while not event.is_set() and self._now < deadline:
+            due = min((task.due for task in self._tasks), default=deadline)
+            self.advance(max(0.0, min(due, deadline) - self._now))
+        return event.is_set()
+
+    def every(self, rate_hz, fn, name):
+        task = _VirtualTask(self, rate_hz, fn, name)
+        self._tasks.append(task)
+        return task
+
+    def advance(self, seconds):
+        target = self._now + seconds
+        while self._tasks:
+            task = min(self._tasks, key=lambda t: t.due)
+            if task.due > target:
+                break
+            self._now = max(self._now, task.due)
+            task.fire()
+        self._now = target
+
+
+# ------------------ Dünya ve Araç ------------------ #
+
+class World:
+    """Engelleri doğru parçaları olarak tutan 2B harita (metre)"""
+
+    def __init__(self):
+        self.segments = []
+
+    def add_wall(self, x1, y1, x2, y2):
+        self.segments.append((x1, y1, x2, y2))
+        return self
+
+    def add_box(self, x0, y0, x1, y1):
+        for segment in ((x0, y0, x1, y0), (x1, y0, x1, y1), (x1, y1, x0, y1), (x0, y1, x0, y0)):
+            self.add_wall(*segment)
+        return self
+
+    def raycast(self, x, y, theta, max_range):
+        """(x, y)'den theta yönündeki ilk engele uzaklık; menzilde yoksa None"""
+        dx, dy = math.cos(theta), math.sin(theta)
+        nearest = None
+        for x1, y1, x2, y2 in self.segments:
+            ex, ey = x2 - x1, y2 - y1
+            denom = dx * ey - dy * ex
+            if abs(denom) < 1e-12:
+                continue
+            t = ((x1 - x) * ey - (y1 - y) * ex) / denom
+            u = ((x1 - x) * dy - (y1 - y) * dx) / denom
+            if t >= 0 and 0 <= u <= 1 and t <= max_range and (nearest is None or t < nearest):
+                nearest = t
+        return nearest
+
+
+class SimVehicle:
+    """Diferansiyel sürüşlü araç, batarya ve sensör modeli.
+
+    Tekerlek hızları komuta birinci dereceden gecikmeyle yaklaşır; sol/sağ
+    kazanç farkı araçtaki motor asimetrisini taklit eder. Batarya gerilimi
+    iç direnç üzerinden akımla düşer ve motor hızını etkiler. Fizik, cihazlara
+    her erişimde saatin gösterdiği zamana kadar sabit adımlarla ilerletilir.
+    """
+
+    def __init__(self, clock, rng=None, x=0.0, y=0.0, theta=0.0,
+                 wheel_base=0.15, max_wheel_speed=0.5, motor_tau=0.08, pwm_deadband=0.1,
+                 left_gain=1.0, right_gain=0.93,
+                 battery_full_v=8.4, battery_empty_v=6.4, battery_capacity_ah=2.0, internal_ohms=0.25,
+                 idle_current_a=0.25, motor_current_a=0.9, physics_dt=0.001):
+        self.clock = clock
+        self.rng = rng or random.Random(0)
+        self.lock = threading.RLock()
+        self.x, self.y, self.theta = x, y, theta
+        self.wheel_base = wheel_base
+        self.max_wheel_speed = max_wheel_speed
+        self.motor_tau = motor_tau
+        self.pwm_deadband = pwm_deadband
+        self.gains = {"left": left_gain, "right": right_gain}
+        self.direction = {"left": 0, "right": 0}
+        self.pwm = {"left": 0.0, "right": 0.0}
+        self.wheel_speed = {"left": 0.0, "right": 0.0}
+        self.yaw_rate_dps = 0.0
+
+        self.battery_full_v = battery_full_v
+        self.battery_empty_v = battery_empty_v
+        self.battery_capacity_ah = battery_capacity_ah
+        self.internal_ohms = internal_ohms
+        self.idle_current_a = idle_current_a
+        self.motor_current_a = motor_current_a
+        self.used_ah = 0.0
+        self.current_a = idle_current_a
+
+        self.physics_dt = physics_dt
+        self.sensors = []  # her fizik adımında step(t) çağrılır
+        self.distance_travelled = 0.0
+        self._time = clock.monotonic()
+
+    # Motor komutları
+    def set_direction(self, side, direction):
+        with self.lock:
+            self.sync()
+            self.direction[side] = direction
+
+    def set_pwm(self, side, value):
+        with self.lock:
+            self.sync()
+            self.pwm[side] = max(0.0, min(1.0, value))
+
+    def command(self, side):
+        pwm = self.pwm[side]
+        if pwm < self.pwm_deadband:
+            return 0.0
+        return self.direction[side] * pwm
+
+    # Batarya
+    def open_circuit_voltage(self):
+        charge = max(0.0, 1.0 - self.used_ah / self.battery_capacity_ah)
+        return self.battery_empty_v + (self.battery_full_v - self.battery_empty_v) * charge
+
+    def bus_voltage(self):
+        return self.open_circuit_voltage() - self.current_a * self.internal_ohms
+
+    # Fizik
+    def sync(self):
+        """Fiziği saatin gösterdiği zamana kadar ilerlet"""
+        with self.lock:
+            target = self.clock.monotonic()
+            while self._time + self.physics_dt <= target:
+                self._step(self.physics_dt)
+            if target > self._time:
+                self._step(target - self._time)
+
+    def _step(self, dt):
+        self.current_a = self.idle_current_a + sum(
+            self.motor_current_a * abs(self.command(side)) for side in ("left", "right"))
+        voltage_ratio = self.bus_voltage() / self.battery_full_v
+        for side in ("left", "right"):
+            target = self.gains[side] * self.max_wheel_speed * self.command(side) * voltage_ratio
+            self.wheel_speed[side] += (target - self.wheel_speed[side]) * min(1.0, dt / self.motor_tau)
+
+        v_left, v_right = self.wheel_speed["left"], self.wheel_speed["right"]
+        speed = (v_left + v_right) / 2
+        omega = (v_right - v_left) / self.wheel_base  # rad/s, saat yönünün tersi pozitif
+        self.x += speed * math.cos(self.theta) * dt
+        self.y += speed * math.sin(self.theta) * dt
+        self.theta += omega * dt
+        self.yaw_rate_dps = math.degrees(omega)
+        self.distance_travelled += abs(speed) * dt
+        self.used_ah += self.current_a * dt / 3600
+        self._time += dt
+        for sensor in self.sensors:
+            sensor.step(self._time)
+
+    def pose(self):
+        with self.lock:
+            self.sync()
+            return {"x": round(self.x, 3), "y": round(self.y, 3),
+                    "heading_deg": round(math.degrees(self.theta), 2)}
+
+
+# ------------------ Sensör ve Sürücü Cihazları ------------------ #
+
+def _int16_bytes(value):
+    value = max(-32768, min(32767, int(round(value))))
+    value &= 0xFFFF
+    return [value >> 8, value & 0xFF]
+
+
+class SimMPU6050:
+    """Yazmaç düzeyinde MPU6050 (gyro Z, DLPF/bölücü, FIFO) öykünmesi"""
+
+    def __init__(self, vehicle, bias_dps=0.8, noise_dps=0.05):
+        self.vehicle = vehicle
+        self.rng = vehicle.rng
+        self.bias_dps = bias_dps
+        self.noise_dps = noise_dps
+        self.dlpf_cfg = 0
+        self.divider = 0
+        self.fifo_z = False
+        self.fifo_enabled = False
+        self.fifo = bytearray()
+        self.overflow = False
+        self.latest = [0, 0]
+        self._next_sample = vehicle.clock.monotonic()
+        vehicle.sensors.append(self)
+
+    @property
+    def sample_rate_hz(self):
+        base = 1000 if 1 <= self.dlpf_cfg <= 6 else 8000
+        return base / (self.divider + 1)
+
+    def step(self, t):
+        while self._next_sample <= t:
+            rate = self.vehicle.yaw_rate_dps + self.bias_dps + self.rng.gauss(0.0, self.noise_dps)
+            self.latest = _int16_bytes(rate * MPU_GYRO_SCALE)
+            if self.fifo_enabled and self.fifo_z:
+                if len(self.fifo) + 2 > MPU_FIFO_SIZE:
+                    self.overflow = True
+                else:
+                    self.fifo.extend(self.latest)
+            self._next_sample += 1.0 / self.sample_rate_hz
+
+    def write(self, register, value):
+        if register == MPU_CONFIG:
+            self.dlpf_cfg = value & 0x07
+        elif register == MPU_SMPLRT_DIV:
+            self.divider = value
+        elif register == MPU_FIFO_EN:
+            self.fifo_z = bool(value & 0x10)
+        elif register == MPU_USER_CTRL:
+            if value & 0x04:
+                self.fifo.clear()
+                self.overflow = False
+            self.fifo_enabled = bool(value & 0x40)
+
+    def read(self, register, length):
+        if register == MPU_INT_STATUS:
+            status = 0x10 if self.overflow else 0x00
+            self.overflow = False  # gerçek çipte okuma bayrağı temizler
+            return [status] + [0] * (length - 1)
+        if register == MPU_GYRO_ZOUT_H:
+            return (self.latest + [0] * length)[:length]
+        if register == MPU_FIFO_COUNTH:
+            count = len(self.fifo)
+            return [count >> 8, count & 0xFF][:length]
+        if register == MPU_FIFO_R_W:
+            data = list(self.fifo[:length])
+            del self.fifo[:length]
+            return data + [0] * (length - len(data))
+        return [0] * length
+
+
+class SimINA219:
+    """Yazmaç düzeyinde INA219: bara gerilimi, şönt, akım ve güç (32V/2A kalibrasyonu)"""
+
+    def __init__(self, vehicle):
+        self.vehicle = vehicle
+        self.registers = {}
+
+    def write(self, register, value):
+        self.registers[register] = value
+
+    def read(self, register, length):
+        vehicle = self.vehicle
+        current = vehicle.current_a
+        voltage = vehicle.bus_voltage()
+        if register == INA_BUSVOLTAGE:
+            raw = int(voltage / 0.004) << 3
+            return [(raw >> 8) & 0xFF, raw & 0xFF]
+        if register == INA_SHUNTVOLTAGE:
+            return _int16_bytes(current * INA_SHUNT_OHMS / 0.00001)
+        if register == INA_CURRENT:
+            return _int16_bytes(current * 1000 / 0.1)
+        if register == INA_POWER:
+            return _int16_bytes(voltage * current / 0.002)
+        value = self.registers.get(register, 0)
+        return [(value >> 8) & 0xFF, value & 0xFF]
+
+
+class SimI2CBus:
+    """smbus/smbus2 ile aynı çağrıları sunan sanal I2C veriyolu"""
+
+    def __init__(self, vehicle, devices):
+        self.vehicle = vehicle
+        self.devices = devices
+
+    def _device(self, addr):
+        device = self.devices.get(addr)
+        if device is None:
+            raise OSError(121, "Remote I/O error")
+        self.vehicle.sync()
+        return device
+
+    def write_byte_data(self, addr, register, value):
+        with self.vehicle.lock:
+            self._device(addr).write(register, value)
+
+    def read_byte_data(self, addr, register):
+        with self.vehicle.lock:
+            return self._device(addr).read(register, 1)[0]
+
+    def read_i2c_block_data(self, addr, register, length):
+        with self.vehicle.lock:
+            return self._device(addr).read(register, length)
+
+    def write_i2c_block_data(self, addr, register, data):
+        with self.vehicle.lock:
+            self._device(addr).write(register, (data[0] << 8) | data[1])
+
+    def close(self):
+        pass
+
+
+class SimMotor:
+    """gpiozero.Motor yerine: yalnızca yön pinleri"""
+
+    def __init__(self, vehicle, side):
+        self.vehicle = vehicle
+        self.side = side
+
+    def forward(self):
+        self.vehicle.set_direction(self.side, 1)
+
+    def backward(self):
+        self.vehicle.set_direction(self.side, -1)
+
+    def stop(self):
+        self.vehicle.set_direction(self.side, 0)
+
+    def close(self):
+        self.stop()
+
+
+class SimPWM:
+    """gpiozero.PWMOutputDevice yerine: tekerlek hız (enable) pini"""
+
+    def __init__(self, vehicle, side):
+        self.vehicle = vehicle
+        self.side = side
+
+    @property
+    def value(self):
+        return self.vehicle.pwm[self.side]
+
+    @value.setter
+    def value(self, value):
+        self.vehicle.set_pwm(self.side, value)
+
+    def close(self):
+        self.value = 0
+
+
+class SimRanger:
+    """HC-SR04 yerine: araç önünden haritaya ışın atar; gürültü ve yankı kaybı içerir"""
+
+    def __init__(self, vehicle, world, max_distance=1.0, mount_offset=0.08, noise_cm=0.5, dropout=0.02):
+        self.vehicle = vehicle
+        self.world = world
+        self.max_distance = max_distance
+        self.mount_offset = mount_offset
+        self.noise_cm = noise_cm
+        self.dropout = dropout
+
+    def measure(self):
+        vehicle = self.vehicle
+        with vehicle.lock:
+            vehicle.sync()
+            x = vehicle.x + self.mount_offset * math.cos(vehicle.theta)
+            y = vehicle.y + self.mount_offset * math.sin(vehicle.theta)
+            distance = self.world.raycast(x, y, vehicle.theta, self.max_distance)
+        if distance is None or vehicle.rng.random() < self.dropout:
+            return None
+        distance += vehicle.rng.gauss(0.0, self.noise_cm / 100)
+        return max(0.02, min(self.max_distance, distance))
+
+    def close(self):
+        pass
+
+
+class SimBackend:
+    """``hal.HardwareBackend`` ile aynı fabrikaları sunan simülasyon arka ucu.
+
+    Varsayılan olarak sanal saat kullanır (görevler gerçek zamandan hızlı
+    koşar). Çok iş parçacıklı web arayüzü için ``realtime=True`` verilir:
+    saat gerçek zamandır, fizik yine cihaz erişiminde ilerletilir.
+    """
+
+    name = "sim"
+
+    def __init__(self, world=None, clock=None, realtime=False, seed=0, vehicle_kwargs=None,
+                 gyro_bias_dps=0.8, gyro_noise_dps=0.05):
+        self.clock = clock or (SYSTEM_CLOCK if realtime else VirtualClock())
+        self.world = world or default_world()
+        self.vehicle = SimVehicle(self.clock, rng=random.Random(seed), **(vehicle_kwargs or {}))
+        self.gyro = SimMPU6050(self.vehicle, bias_dps=gyro_bias_dps, noise_dps=gyro_noise_dps)
+        ina219 = SimINA219(self.vehicle)
+        self.bus = SimI2CBus(self.vehicle, {0x68: self.gyro, 0x40: ina219, 0x42: ina219})
+
+    def i2c_bus(self, bus_id):
+        return self.bus
+
+    def motor(self, side, forward, backward):
+        return SimMotor(self.vehicle, side)
+
+    def pwm(self, side, pin):
+        return SimPWM(self.vehicle, side)
+
+    def ranger(self, echo, trigger, max_distance):
+        return SimRanger(self.vehicle, self.world, max_distance=max_distance)
+
+
+def default_world():
+    """4 x 3 m'lik oda; araç (0, 0)'da +x yönüne bakar, 1.5 m önünde bir kutu var"""
+    return World().add_box(-0.5, -1.5, 3.5, 1.5).add_box(1.5, -0.2, 1.8, 0.2)
+
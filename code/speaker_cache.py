@@ -0,0 +1,272 @@
+import os
+import json
+import hashlib
+import threading
+import numpy as np
+import torch
+
+# Kalıcı depo biçimi değişirse artırılır; eski depolar yok sayılır
+STORE_VERSION = 1
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SpeakerEmbeddingCache:
+    """Yetkili kullanıcıların referans ses gömmelerini (embedding) bellekte tutar.
+
+    Her referans WAV dosyası yalnızca bir kez ECAPA modelinden geçirilir;
+    gelen komutlar için sadece yeni kaydın gömmesi hesaplanır. Gömmeler
+    ``store_path`` altında float32 satırlar (``.f32``) ve bir JSON indeks
+    olarak saklanır, böylece yeniden başlatmada model çalıştırılmadan yüklenir.
+    """
+
+    def __init__(self, model, model_id, store_path=None):
+        self.model = model
+        self.model_id = model_id
+        self.store_path = store_path
+        self._lock = threading.Lock()
+        self._entries = {}  # kullanıcı adı -> [(referans dosyası, gömme vektörü)]
+
+        # Kalıcı depo: dosya -> {"name", "sha256", "row"}
+        self._index = {}
+        self._dim = None
+        self._rows = 0
+        self._dead_rows = 0
+
+        # Toplu skorlama için birim uzunlukta gömme matrisi (N x D)
+        self._matrix = None
+        self._user_index = None  # her satırın ait olduğu kullanıcının indeksi
+        self._user_names = []
+        self._dirty = True
+
+    # ------------------ Gömme Hesaplama ------------------ #
+
+    def encode_file(self, path):
+        waveform = self.model.load_audio(path)
+        with torch.no_grad():
+            emb = self.model.encode_batch(waveform.unsqueeze(0), normalize=False)
+        return emb.squeeze().cpu().numpy().astype(np.float32)
+
+    def encode_array(self, audio, fs):
+        """Bellekteki (örnek, kanal) float ses dizisinin gömmesini hesapla"""
+        waveform = self.model.audio_normalizer(torch.from_numpy(np.asarray(audio, dtype=np.float32)), fs)
+        with torch.no_grad():
+            emb = self.model.encode_batch(waveform.unsqueeze(0), normalize=False)
+        return emb.squeeze().cpu().numpy().astype(np.float32)
+
+    def warm_up(self, seconds=1.0, fs=16000):
+        """Sahte bir girişle modeli bir kez çalıştır (ilk gerçek doğrulamanın gecikmesini önler)"""
+        dummy = torch.randn(1, int(seconds * fs)) * 1e-3
+        with torch.no_grad():
+            self.model.encode_batch(dummy, normalize=False)
+
+    # ------------------ Kalıcı Depo ------------------ #
+
+    def _data_file(self):
+        return self.store_path + '.f32'
+
+    def _index_file(self):
+        return self.store_path + '.json'
+
+    def load_store(self, users_dict):
+        """Depodaki gömmeleri model çalıştırmadan yükle.
+
+        Dosya özeti değişmiş ya da eksik olan referanslar yüklenmez;
+        bunlar ``sync`` ile yeniden hesaplanır. Yüklenen referans sayısını döndürür.
+        """
+        if not self.store_path or not os.path.exists(self._index_file()):
+            return 0
+
+        try:
+            with open(self._index_file(), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != STORE_VERSION or meta.get('model') != self.model_id:
+                print("⚠️ Gömme deposu farklı bir sürüme ait, yeniden oluşturulacak")
+                return 0
+
+            dim = int(meta['dim'])
+            rows = int(meta['rows'])
+            data = np.memmap(self._data_file(), dtype=np.float32, mode='r', shape=(rows, dim))
+        except Exception as e:
+            print(f"Gömme deposu yüklenirken hata: {e}")
+            return 0
+
+        loaded = 0
+        entries = {}
+        index = {}
+        for ref_file, item in meta.get('files', {}).items():
+            name = item['name']
+            if name not in users_dict or ref_file not in users_dict[name]:
+                continue
+            if not os.path.exists(ref_file) or file_sha256(ref_file) != item['sha256']:
+                continue
+            index[ref_file] = item
+            entries.setdefault(name, []).append((ref_file, data[item['row']]))
+            loaded += 1
+
+        with self._lock:
+            self._dim = dim
+            self._rows = rows
+            self._dead_rows = rows - len(index)
+            self._index = index
+            self._entries = entries
+            self._dirty = True
+        print(f"💾 Depodan {loaded} referans gömmesi yüklendi")
+        return loaded
+
+    def _append_rows(self, items):
+        """(dosya, kullanıcı, sha256, gömme) kayıtlarını depoya ekle. Kilit tutulurken çağrılır."""
+        if not self.store_path or not items:
+            return
+        self._dim = items[0][3].shape[0]
+
+        mode = 'r+b' if os.path.exists(self._data_file()) else 'wb'
+        with open(self._data_file(), mode) as f:
+            # İndekste olmayan (yarım kalmış) satırları at, sona ekle
+            f.seek(self._rows * self._dim * 4)
+            f.truncate()
+            for ref_file, name, sha, emb in items:
+                f.write(np.ascontiguousarray(emb, dtype=np.float32).tobytes())
+                if ref_file in self._index:
+                    self._dead_rows += 1
+                self._index[ref_file] = {"name": name, "sha256": sha, "row": self._rows}
+                self._rows += 1
+        self._write_index()
+
+    def _drop_rows(self, ref_files):
+        """Dosyaların satırlarını geçersiz say; çöp çoğalınca depoyu sıkıştır."""
+        if not self.store_path:
+            return
+        for ref_file in ref_files:
+            if self._index.pop(ref_file, None) is not None:
+                self._dead_rows += 1
+        if self._dead_rows > max(16, self._rows // 2):
+            self._compact()
+        else:
+            self._write_index()
+
+    def _compact(self):
+        live = sorted(self._index.items(), key=lambda kv: kv[1]['row'])
+        data = np.memmap(self._data_file(), dtype=np.float32, mode='r', shape=(self._rows, self._dim))
+        tmp_path = self._data_file() + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for row, (_, item) in enumerate(live):
+                f.write(np.ascontiguousarray(data[item['row']]).tobytes())
+                item['row'] = row
+        del data
+        os.replace(tmp_path, self._data_file())
+        self._rows = len(live)
+        self._dead_rows = 0
+        self._write_index()
+
+    def _write_index(self):
+        meta = {
+            "version": STORE_VERSION,
+            "model": self.model_id,
+            "dim": self._dim,
+            "rows": self._rows,
+            "files": self._index,
+        }
+        tmp_path = self._index_file() + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self._index_file())
+
+    # ------------------ Kullanıcı Yönetimi ------------------ #
+
+    def add_user(self, name, ref_files):
+        entries = []
+        new_rows = []
+        for ref_file in ref_files:
+            if not os.path.exists(ref_file):
+                print(f"❌ Dosya bulunamadı: {ref_file}")
+                continue
+            emb = self.encode_file(ref_file)
+            entries.append((ref_file, emb))
+            new_rows.append((ref_file, name, file_sha256(ref_file), emb))
+
+        with self._lock:
+            self._entries[name] = entries
+            self._dirty = True
+            try:
+                self._append_rows(new_rows)
+            except Exception as e:
+                print(f"Gömme deposu kaydedilirken hata: {e}")
+        print(f"🧬 {name} için {len(entries)} referans gömmesi hazır")
+
+    def remove_user(self, name):
+        with self._lock:
+            entries = self._entries.pop(name, [])
+            self._dirty = True
+            try:
+                self._drop_rows([ref_file for ref_file, _ in entries])
+            except Exception as e:
+                print(f"Gömme deposu kaydedilirken hata: {e}")
+
+    def sync(self, users_dict):
+        """Bellekteki gömmeleri kullanıcı listesiyle eşitle; yalnızca eksikleri hesapla"""
+        with self._lock:
+            cached = {name: {ref for ref, _ in entries} for name, entries in self._entries.items()}
+
+        for name in set(cached) - set(users_dict):
+            self.remove_user(name)
+
+        for name, ref_files in users_dict.items():
+            if set(ref_files) - cached.get(name, set()):
+                self.add_user(name, ref_files)
+
+    # ------------------ Toplu Tanımlama ------------------ #
+
+    def _build_matrix(self):
+        names, rows, index = [], [], []
+        for name, entries in self._entries.items():
+            if not entries:
+                continue
+            for _, emb in entries:
+                rows.append(emb)
+                index.append(len(names))
+            names.append(name)
+
+        if rows:
+            matrix = np.stack(rows).astype(np.float32)
+            matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-6)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+
+        self._matrix = matrix
+        self._user_index = np.asarray(index, dtype=np.intp)
+        self._user_names = names
+        self._dirty = False
+
+    def identify(self, query_emb):
+        """Sorguyu tüm kayıtlı gömmelerle tek seferde karşılaştır.
+
+        (en iyi kullanıcı, en iyi skor, [(kullanıcı, skor), ...]) döndürür;
+        liste skora göre azalan sıradadır. Kayıtlı kullanıcı yoksa
+        (None, 0.0, []) döner.
+        """
+        with self._lock:
+            if self._dirty:
+                self._build_matrix()
+            matrix, user_index, names = self._matrix, self._user_index, self._user_names
+
+        if matrix.shape[0] == 0:
+            return None, 0.0, []
+
+        query = np.asarray(query_emb, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-6)
+        row_scores = matrix @ query
+
+        # Kullanıcı başına en yüksek referans skoru
+        user_scores = np.full(len(names), -np.inf, dtype=np.float32)
+        np.maximum.at(user_scores, user_index, row_scores)
+
+        order = np.argsort(user_scores)[::-1]
+        ranked = [(names[i], float(user_scores[i])) for i in order]
+        return ranked[0][0], ranked[0][1], ranked
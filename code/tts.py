@@ -0,0 +1,343 @@
+import os
+import time
+import json
+import heapq
+import hashlib
+import itertools
+import threading
+from collections import OrderedDict
+import numpy as np
+from http_clients import get_client
+
+ELEVENLABS_API_KEY = "your-api-key"
+ELEVENLABS_VOICE_ID = "IuRRIAcbQK5AQk1XevPj"
+VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.2}
+
+# Ham 16 bit PCM istenir: parça parça çözülebilir, dosya ya da kod çözücü gerekmez
+OUTPUT_FORMAT = "pcm_22050"
+TTS_SAMPLERATE = 22050
+
+# Önbellekte olmayan cümleler ilk parça gelir gelmez çalmaya başlar
+TTS_STREAMING = True
+JITTER_BUFFER_MS = 120
+
+# ElevenLabs istemcisi (arayuz.py ve pidandgyro.py aynı bağlantı havuzunu paylaşır);
+# ELEVENLABS_BASE_URL ile yerel bir test sunucusuna yönlendirilebilir
+elevenlabs = get_client("elevenlabs", os.environ.get("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io"),
+                        read_timeout=15.0)
+
+# Araç tarafından sürekli tekrarlanan sabit cümleler
+FIXED_PHRASES = [
+    "Engel algılandı. Duruyorum.",
+    "Araç durduruluyor.",
+    "Geri dönülüyor.",
+    "Engel algılanana kadar ileri gidiliyor.",
+    "Yetkisiz kullanıcı. Bu komut uygulanamaz.",
+]
+
+# Sayısal kalıplar ve başlangıçta önceden sentezlenecek yaygın değerleri
+PHRASE_TEMPLATES = {
+    "{} saniye ileri gidiliyor.": [1, 2, 3, 4, 5, 10],
+    "{} saniye geri gidiliyor.": [1, 2, 3, 5],
+    "{} derece sağa dönülüyor.": [30, 45, 90, 180],
+    "{} derece sola dönülüyor.": [30, 45, 90, 180],
+}
+
+
+def common_phrases():
+    phrases = list(FIXED_PHRASES)
+    for template, values in PHRASE_TEMPLATES.items():
+        phrases.extend(template.format(value) for value in values)
+    return phrases
+
+
+class PhraseCache:
+    """Çözülmüş PCM ses için içerik adresli önbellek.
+
+    Anahtar; metin, ses kimliği ve ses ayarlarının özetidir. Bellek katmanı
+    toplam bayt sınırına göre LRU ile boşaltılır; ``cache_dir`` verilirse
+    örnekler .npz olarak diske de yazılır ve yeniden başlatmada ağ gerekmez.
+    Disk katmanı ``max_disk_bytes`` ile sınırlıdır: en uzun süredir
+    kullanılmayan dosyalar (değiştirilme zamanına göre) önce silinir.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, cache_dir=None, max_disk_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.cache_dir = cache_dir
+        self._items = OrderedDict()  # anahtar -> (pcm, örnekleme hızı)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text, voice_id=ELEVENLABS_VOICE_ID, voice_settings=VOICE_SETTINGS, output_format=OUTPUT_FORMAT):
+        material = json.dumps([text, voice_id, voice_settings, output_format], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _store(self, key, pcm, samplerate):
+        self._items[key] = (pcm, samplerate)
+        self._items.move_to_end(key)
+        self._bytes += pcm.nbytes
+        while self._bytes > self.max_bytes and len(self._items) > 1:
+            _, (old_pcm, _) = self._items.popitem(last=False)
+            self._bytes -= old_pcm.nbytes
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item
+
+            if self.cache_dir and os.path.exists(self._disk_path(key)):
+                try:
+                    with np.load(self._disk_path(key)) as f:
+                        item = (f['pcm'], int(f['samplerate']))
+                    os.utime(self._disk_path(key))  # kullanılan dosya disk boşaltmasında sona kalır
+                    self._store(key, *item)
+                    self.hits += 1
+                    return item
+                except Exception as e:
+                    print(f"TTS önbelleği okunurken hata: {e}")
+
+            self.misses += 1
+            return None
+
+    def put(self, key, pcm, samplerate):
+        pcm = np.ascontiguousarray(pcm, dtype=np.float32)
+        with self._lock:
+            if key in self._items:
+                return
+            self._store(key, pcm, samplerate)
+        if self.cache_dir:
+            try:
+                # Dizin ilk kayıtta oluşturulur: modülü içe aktarmak çalışma dizinine yazmaz
+                os.makedirs(self.cache_dir, exist_ok=True)
+                np.savez(self._disk_path(key), pcm=pcm, samplerate=samplerate)
+                self._trim_disk()
+            except Exception as e:
+                print(f"TTS önbelleği kaydedilirken hata: {e}")
+
+    def _trim_disk(self):
+        """Disk katmanı sınırı aşıyorsa en eski dosyaları sil"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._items),
+                "bytes": self._bytes,
+            }
+
+
+phrase_cache = PhraseCache(cache_dir='tts_cache')
+
+
+def _tts_request(text, stream, client=None):
+    client = client or elevenlabs
+    headers = {
+        "xi-api-key": ELEVENLABS_API_KEY,
+        "Content-Type": "application/json"
+    }
+    payload = {
+        "text": text,
+        "voice_settings": VOICE_SETTINGS
+    }
+    path = f"/v1/text-to-speech/{ELEVENLABS_VOICE_ID}" + ("/stream" if stream else "")
+    response = client.post(path, endpoint="/v1/text-to-speech" + ("/stream" if stream else ""),
+                           params={"output_format": OUTPUT_FORMAT}, headers=headers, json=payload, stream=stream)
+    response.raise_for_status()
+    return response
+
+
+def _pcm16_to_float(data):
+    return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def synthesize(text):
+    """Metni çözülmüş PCM olarak döndür (pcm, örnekleme hızı); önbellekte varsa ağa çıkmaz"""
+    key = PhraseCache.key(text)
+    cached = phrase_cache.get(key)
+    if cached is not None:
+        return cached
+
+    data = _tts_request(text, stream=False).content
+    pcm = _pcm16_to_float(data[:len(data) - len(data) % 2])
+    phrase_cache.put(key, pcm, TTS_SAMPLERATE)
+    return pcm, TTS_SAMPLERATE
+
+
+def stream_pcm(text, client=None, chunk_bytes=2048):
+    """Parçalı (chunked) TTS yanıtını geldikçe float32 PCM parçaları olarak üret"""
+    response = _tts_request(text, stream=True, client=client)
+    leftover = b""
+    with response:
+        for chunk in response.iter_content(chunk_size=chunk_bytes):
+            data = leftover + chunk
+            usable = len(data) - len(data) % 2  # örnek ortasında bölünen bayt sonraki parçaya kalır
+            leftover = data[usable:]
+            if usable:
+                yield _pcm16_to_float(data[:usable])
+
+
+# Çalma öncelikleri: küçük değer önce çalar
+PRIORITY_URGENT = 0
+PRIORITY_NORMAL = 1
+
+
+class AudioOutputWorker:
+    """Tek ve kalıcı bir çıkış akışı üzerinden sesleri sırayla çalan iş parçacığı.
+
+    ``say`` hemen döner, böylece hareket komutları anonsları beklemeden başlar.
+    Kuyruk önceliklidir; acil bir mesaj (ör. engel uyarısı) gelince çalmakta
+    olan daha düşük öncelikli ses blok sınırında kesilir ve acil mesaj önce çalar.
+    """
+
+    def __init__(self, samplerate=TTS_SAMPLERATE, block_frames=1024, jitter_ms=JITTER_BUFFER_MS):
+        self.samplerate = samplerate
+        self.block_frames = block_frames
+        self.jitter_frames = samplerate * jitter_ms // 1000
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stream = None
+        self._thread = None
+
+    def say(self, text, priority=PRIORITY_NORMAL):
+        """Metni kuyruğa ekle; çalma bitince (ya da atlanınca) set edilen Event döndür"""
+        done = threading.Event()
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audio-output", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (priority, next(self._seq), text, done))
+            self._cond.notify()
+        return done
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _higher_priority_waiting(self, priority):
+        with self._cond:
+            return bool(self._heap) and self._heap[0][0] < priority
+
+    def _ensure_stream(self):
+        if self._stream is None:
+            import sounddevice as sd  # ses aygıtı yalnızca ilk çalmada gerekir
+            self._stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype='float32')
+            self._stream.start()
+        return self._stream
+
+    def _prepare(self, pcm, samplerate):
+        pcm = np.asarray(pcm, dtype=np.float32)
+        if pcm.ndim > 1:
+            pcm = pcm.mean(axis=1)
+        if samplerate != self.samplerate and len(pcm) > 1:
+            n = int(round(len(pcm) * self.samplerate / samplerate))
+            pcm = np.interp(np.linspace(0, len(pcm) - 1, n), np.arange(len(pcm)), pcm).astype(np.float32)
+        return pcm.reshape(-1, 1)
+
+    def _play(self, pcm, samplerate, priority):
+        pcm = self._prepare(pcm, samplerate)
+        stream = self._ensure_stream()
+        for start in range(0, len(pcm), self.block_frames):
+            if self._higher_priority_waiting(priority):
+                print("🔇 Anons acil mesaj için kesildi")
+                return
+            stream.write(pcm[start:start + self.block_frames])
+
+    def _play_stream(self, text, priority):
+        """Önbellekte olmayan cümleyi akışla çal; tamamı gelirse önbelleğe ekle"""
+        stream = self._ensure_stream()
+        parts, pending, pending_frames = [], [], 0
+        started = False
+        request_time = time.monotonic()
+
+        for pcm in stream_pcm(text):
+            if self._higher_priority_waiting(priority):
+                print("🔇 Anons acil mesaj için kesildi")
+                return
+            parts.append(pcm)
+            pending.append(pcm)
+            pending_frames += len(pcm)
+
+            # Küçük bir titreşim (jitter) tamponu dolmadan çalmaya başlama
+            if not started and pending_frames < self.jitter_frames:
+                continue
+            if not started:
+                started = True
+                print(f"🔊 İlk ses {(time.monotonic() - request_time) * 1000:.0f} ms sonra çalıyor")
+            stream.write(np.concatenate(pending).reshape(-1, 1))
+            pending, pending_frames = [], 0
+
+        if pending:
+            stream.write(np.concatenate(pending).reshape(-1, 1))
+        if parts:
+            phrase_cache.put(PhraseCache.key(text), np.concatenate(parts), TTS_SAMPLERATE)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                priority, _, text, done = heapq.heappop(self._heap)
+            try:
+                cached = phrase_cache.get(PhraseCache.key(text))
+                if cached is not None:
+                    self._play(*cached, priority)
+                elif TTS_STREAMING:
+                    self._play_stream(text, priority)
+                else:
+                    data, samplerate = synthesize(text)
+                    self._play(data, samplerate, priority)
+            except Exception as e:
+                print(f"TTS error: {e}")
+                if self._stream is not None:
+                    try:
+                        self._stream.close()
+                    except Exception:
+                        pass
+                    self._stream = None
+            finally:
+                done.set()
+
+
+audio_output = AudioOutputWorker()
+
+
+def speak_text_with_elevenlabs(text, priority=PRIORITY_NORMAL, wait=False):
+    """Metni çalma kuyruğuna ekle; wait=True ise çalma bitene kadar bekle"""
+    done = audio_output.say(text, priority)
+    if wait:
+        done.wait()
+    return done
+
+
+def prewarm_phrases():
+    """Sabit cümleleri ve yaygın sayısal varyantları önceden sentezle"""
+    for phrase in common_phrases():
+        try:
+            synthesize(phrase)
+        except Exception as e:
+            print(f"TTS ön ısıtma hatası ({phrase}): {e}")
+    print(f"🔊 TTS önbelleği hazır: {phrase_cache.stats()['entries']} cümle")
+
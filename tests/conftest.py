@@ -0,0 +1,49 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# Modüller code/ altında düz içe aktarımla birbirini kullanır
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "code"))
+
+from simulator import SimBackend, World  # noqa: E402
+from pidandgyro import MPU6050, Robot  # noqa: E402
+
+
+@pytest.fixture
+def sim_robot():
+    """Simülatörde robot kuran fabrika; (robot, backend, söylenenler) döndürür"""
+    created = []
+
+    def make(world=None, realtime=False, sampler_hz=100):
+        backend = SimBackend(world=world or World(), realtime=realtime)
+        gyro = MPU6050(bus=backend.i2c_bus(1), clock=backend.clock)
+        gyro.start_sampler(sampler_hz)
+        spoken = []
+        robot = Robot(gyro, backend=backend, speak=spoken.append)
+        created.append((robot, gyro))
+        return robot, backend, spoken
+
+    yield make
+    for robot, gyro in created:
+        robot.shutdown()
+        gyro.stop_sampler()
+
+
+@pytest.fixture
+def stub_server():
+    """Verilen istek işleyicisiyle yerel HTTP sunucusu başlatan fabrika; temel URL döndürür"""
+    servers = []
+
+    def serve(handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}"
+
+    yield serve
+    for server in servers:
+        server.shutdown()
+        server.server_close()
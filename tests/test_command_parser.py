@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from command_parser import parse_command_text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("üç saniye ileri git sonra doksan derece sağa dön",
+     [{"komut": "ileri_git", "sure": "3_saniye"}, {"komut": "saga_don", "derece": 90}]),
+    ("geri git", [{"komut": "geri_git", "sure": "2_saniye"}]),
+    ("sıfır saniye geri git", [{"komut": "geri_git", "sure": "0_saniye"}]),
+    ("tam tersine dön", [{"komut": "geri_don", "derece": 180}]),
+])
+def test_parses_simple_commands(text, expected):
+    assert json.loads(parse_command_text(text)) == expected
+
+
+@pytest.mark.parametrize("text", ["saniye ileri git", "derece sağa dön", "önce saniye geri git", "tam", "tam git"])
+def test_unit_without_number_falls_back_to_llm(text):
+    assert parse_command_text(text) is None
@@ -0,0 +1,43 @@
+import json
+from http.server import BaseHTTPRequestHandler
+
+from http_clients import PooledClient, latency_stats
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """İlk istekte 503, sonrakilerde 200 döner"""
+    protocol_version = "HTTP/1.1"
+    calls = 0
+
+    def do_POST(self):
+        FlakyHandler.calls += 1
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        status = 503 if FlakyHandler.calls == 1 else 200
+        body = json.dumps({"call": FlakyHandler.calls}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_retries_503_and_records_latency(stub_server):
+    FlakyHandler.calls = 0
+    client = PooledClient("flaky-stub", stub_server(FlakyHandler), backoff=0.01)
+    try:
+        response = client.post("/echo", json={"text": "merhaba"})
+        assert response.status_code == 200
+        assert response.json() == {"call": 2}
+
+        client.post("/echo", json={"text": "merhaba"})
+    finally:
+        client.close()
+
+    histogram = latency_stats()["flaky-stub POST /echo"]
+    assert histogram["count"] == 3
+    assert histogram["errors"] == 1
+    assert sum(histogram["buckets_ms"].values()) == 3
+    assert histogram["p50_ms"] is not None
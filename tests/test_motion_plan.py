@@ -0,0 +1,24 @@
+from motion_plan import PlanCompiler, compile_plan
+
+
+def test_turn_is_released_once_a_forward_follows():
+    compiler = PlanCompiler()
+    assert compiler.push({"komut": "saga_don", "derece": 90}) == []
+    # Dönüş artık değişemez: ilk hareket üçüncü komutu beklemeden çıkar
+    assert compiler.push({"komut": "ileri_git", "sure": "2_saniye"}) == [{"komut": "saga_don", "derece": 90}]
+    assert compiler.push({"komut": "sola_don", "derece": 90}) == [{"komut": "ileri_git", "sure": "2_saniye"}]
+    assert compiler.flush() == [{"komut": "sola_don", "derece": 90}]
+
+
+def test_half_turn_and_forward_are_held_together():
+    compiler = PlanCompiler()
+    assert compiler.push({"komut": "geri_don"}) == []
+    assert compiler.push({"komut": "ileri_git", "sure": "2_saniye"}) == []
+    assert compiler.push({"komut": "ileri_git", "sure": "1_saniye"}) == []
+    assert compiler.push({"komut": "saga_don", "derece": 90}) == [{"komut": "geri_git", "sure": "3_saniye"}]
+
+
+def test_compile_plan_simplifies():
+    plan = [{"komut": "ileri_git", "sure": "1_saniye"}, {"komut": "ileri_git", "sure": "2_saniye"},
+            {"komut": "saga_don", "derece": 90}, {"komut": "sola_don", "derece": 90}, {"komut": "dur"}]
+    assert compile_plan(plan) == [{"komut": "ileri_git", "sure": "3_saniye"}]
@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+ESTOP_AFTER_S = 0.2
+
+# ad -> (çağrı, iptali görmesi beklenen döngü)
+PRIMITIVES = {
+    "move_forward": (lambda robot: robot.move_forward(10), "move_forward"),
+    "pid_turn": (lambda robot: robot._execute_pid_turn(720, direction="right"), "turn"),
+    "move_until_obstacle": (lambda robot: robot.move_until_obstacle(), "move_until_obstacle"),
+    "follow_trajectory": (lambda robot: robot.follow_trajectory(
+        [("forward", 10, None), ("until_obstacle", None, None)]), "trajectory"),
+}
+
+
+@pytest.mark.parametrize("name", sorted(PRIMITIVES))
+def test_estop_halts_within_one_control_period(sim_robot, name):
+    robot, backend, _ = sim_robot(realtime=True)
+    run, loop_name = PRIMITIVES[name]
+    timer = threading.Timer(ESTOP_AFTER_S, robot.estop)
+    timer.start()
+    try:
+        assert run(robot) is False
+    finally:
+        timer.cancel()
+
+    stats = robot.halt_stats()
+    assert stats["cancelled"] and stats["count"] == 1
+    assert stats["last_loop"] == loop_name
+    assert stats["last_ms"] <= stats["last_period_ms"]
+    assert backend.vehicle.pwm == {"left": 0.0, "right": 0.0}
+
+
+def test_trajectory_until_obstacle_times_out(sim_robot):
+    robot, backend, spoken = sim_robot()
+    start = backend.clock.monotonic()
+
+    assert robot.follow_trajectory([("until_obstacle", None, None)], timeout_sec=5.0) is False
+
+    assert 5.0 <= backend.clock.monotonic() - start < 5.5
+    assert backend.vehicle.pwm == {"left": 0.0, "right": 0.0}
+    assert spoken == ["Engel algılanmadı. Duruyorum."]
+
+
+def test_move_until_obstacle_times_out(sim_robot):
+    robot, backend, spoken = sim_robot()
+    start = backend.clock.monotonic()
+
+    assert robot.move_until_obstacle(timeout_sec=5.0) is False
+
+    assert 5.0 <= backend.clock.monotonic() - start < 5.5
+    assert spoken == ["Engel algılanmadı. Duruyorum."]
+
@@ -0,0 +1,43 @@
+import importlib
+import os
+
+import pytest
+
+for _module in ("flask", "sounddevice", "speech_recognition", "openai", "speechbrain"):
+    pytest.importorskip(_module)
+
+
+@pytest.fixture(scope="module")
+def app_client(tmp_path_factory):
+    """arayuz'u simülatör arka ucuyla ve geçici çalışma dizininde içe aktar"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("arayuz"))
+    os.environ["ROBOT_BACKEND"] = "sim"
+    try:
+        arayuz = importlib.import_module("arayuz")
+        arayuz.app.testing = True
+        yield arayuz, arayuz.app.test_client()
+    finally:
+        os.environ.pop("ROBOT_BACKEND", None)
+        os.chdir(cwd)
+
+
+def test_dashboard_estop_redirects(app_client):
+    arayuz, client = app_client
+    try:
+        response = client.post("/estop")
+        assert response.status_code == 302
+        assert response.headers["Location"].endswith("/")
+        assert arayuz.robot.cancel.is_set()
+    finally:
+        arayuz.robot.clear_cancel()
+
+
+def test_estop_json(app_client):
+    arayuz, client = app_client
+    try:
+        response = client.post("/estop?format=json")
+        assert response.status_code == 200
+        assert response.get_json()["stopped"] is True
+    finally:
+        arayuz.robot.clear_cancel()
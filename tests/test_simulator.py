@@ -0,0 +1,58 @@
+import time
+
+from INA219 import INA219
+from simulator import SimBackend, World, default_world
+
+SENSOR_OFFSET_M = 0.08  # SimRanger.mount_offset
+
+
+def test_mission_runs_faster_than_real_time(sim_robot):
+    # default_world: araç 4 x 3 m'lik odada, arka duvar x = -0.5 m
+    robot, backend, spoken = sim_robot(world=default_world())
+    battery = INA219(addr=0x42, bus=backend.i2c_bus(1))
+    wall_start = time.monotonic()
+
+    robot.gyro.calibrate()
+    assert robot.follow_trajectory([("turn", 90, None), ("forward", 2, None), ("turn", -90, None),
+                                    ("forward", 1, None), ("turn", -90, None), ("forward", 2, None)])
+    pose = backend.vehicle.pose()
+    assert abs(pose["heading_deg"] - 90) < 5
+    assert abs(pose["y"]) < 0.15
+
+    assert robot.turn_left(90)
+    assert robot.move_until_obstacle()
+
+    wall_gap_cm = (backend.vehicle.x - SENSOR_OFFSET_M + 0.5) * 100
+    assert 30 <= wall_gap_cm <= 45
+    assert spoken == ["Engel algılandı. Duruyorum."]
+
+    virtual_s = backend.clock.monotonic()
+    assert virtual_s > 8
+    assert time.monotonic() - wall_start < virtual_s / 10
+    assert 7.5 < battery.getBusVoltage_V() < 8.4
+
+
+def test_trajectory_stops_at_obstacle(sim_robot):
+    # 1.5 m önde duvar: araç durma mesafesinde (40 cm) durmalı
+    robot, backend, spoken = sim_robot(world=World().add_wall(1.5, -1.0, 1.5, 1.0))
+
+    assert robot.follow_trajectory([("until_obstacle", None, None)]) is True
+
+    wall_gap_cm = (1.5 - backend.vehicle.x - SENSOR_OFFSET_M) * 100
+    assert 30 <= wall_gap_cm <= 45
+    assert spoken == ["Engel algılandı. Duruyorum."]
+
+
+def test_battery_sags_under_load():
+    backend = SimBackend(world=World())
+    battery = INA219(addr=0x40, bus=backend.i2c_bus(1))
+    idle_v = battery.getBusVoltage_V()
+
+    for side in ("left", "right"):
+        backend.motor(side, None, None).forward()
+        backend.pwm(side, None).value = 1.0
+    backend.clock.sleep(1.0)
+
+    assert battery.getBusVoltage_V() < idle_v - 0.3
+    assert battery.getCurrent_mA() > 1500
+    assert backend.vehicle.x > 0.3
@@ -0,0 +1,98 @@
+import os
+import time
+from http.server import BaseHTTPRequestHandler
+
+import numpy as np
+import pytest
+
+import tts
+from http_clients import PooledClient
+
+CHUNK_BYTES = 4001  # tek sayı: örnekler parça sınırında bölünür
+CHUNK_DELAY_S = 0.05
+
+
+class ChunkedTTSHandler(BaseHTTPRequestHandler):
+    """1 saniyelik 440 Hz PCM'i gecikmeli, parçalı (chunked) yanıtla gönderir"""
+    protocol_version = "HTTP/1.1"
+    finished_at = None
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        t = np.arange(tts.TTS_SAMPLERATE) / tts.TTS_SAMPLERATE
+        pcm = (np.sin(2 * np.pi * 440 * t) * 8000).astype("<i2").tobytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(pcm), CHUNK_BYTES):
+            chunk = pcm[start:start + CHUNK_BYTES]
+            self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.flush()
+            time.sleep(CHUNK_DELAY_S)
+        ChunkedTTSHandler.finished_at = time.monotonic()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class RecordingStream:
+    """Ses çıkışı yerine yazılan blokları zamanlarıyla kaydeder"""
+
+    def __init__(self):
+        self.writes = []
+
+    def write(self, block):
+        self.writes.append((time.monotonic(), len(block)))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def tts_stub(stub_server, monkeypatch):
+    ChunkedTTSHandler.finished_at = None
+    client = PooledClient("tts-stub", stub_server(ChunkedTTSHandler))
+    monkeypatch.setattr(tts, "elevenlabs", client)
+    monkeypatch.setattr(tts, "phrase_cache", tts.PhraseCache())
+    yield client
+    client.close()
+
+
+def test_stream_pcm_yields_before_response_ends(tts_stub):
+    arrivals = []
+    for pcm in tts.stream_pcm("Merhaba"):
+        arrivals.append((time.monotonic(), len(pcm)))
+
+    assert sum(n for _, n in arrivals) == tts.TTS_SAMPLERATE
+    assert len(arrivals) > 1
+    assert arrivals[0][0] < ChunkedTTSHandler.finished_at
+
+
+def test_worker_plays_first_chunk_before_stream_ends(tts_stub):
+    worker = tts.AudioOutputWorker()
+    worker._stream = RecordingStream()
+
+    assert worker.say("Merhaba").wait(timeout=5)
+
+    writes = worker._stream.writes
+    assert writes[0][0] < ChunkedTTSHandler.finished_at
+    # Titreşim tamponu dolmadan çalma başlamaz
+    assert writes[0][1] >= worker.jitter_frames
+    assert sum(n for _, n in writes) == tts.TTS_SAMPLERATE
+    assert tts.phrase_cache.get(tts.PhraseCache.key("Merhaba")) is not None
+
+
+def test_phrase_cache_bounds_disk_tier(tmp_path):
+    pcm = np.zeros(1000, dtype=np.float32)  # ~4 kB/dosya
+    cache = tts.PhraseCache(cache_dir=str(tmp_path / "tts_cache"), max_disk_bytes=10_000)
+    keys = [tts.PhraseCache.key(f"cümle {i}") for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, pcm, tts.TTS_SAMPLERATE)
+        os.utime(cache._disk_path(key), (i, i))  # yazılma sırası dosya sisteminin çözünürlüğünden bağımsız
+
+    cache._trim_disk()
+    files = sorted(p.name for p in (tmp_path / "tts_cache").iterdir())
+    assert sum((tmp_path / "tts_cache" / name).stat().st_size for name in files) <= 10_000
+    assert files == sorted(f"{key}.npz" for key in keys[-len(files):])